@@ -10,6 +10,7 @@ from config import load_config, save_config
 from proxmox_api import get_all_vms, update_vm_tags, get_cluster_options, update_cluster_options
 from tag_utils import (
     extract_tags,
+    parse_tags,
     parse_tag_style,
     format_tag_style,
     parse_color_map,
@@ -20,7 +21,8 @@ from tag_utils import (
 from cluster_options import safe_get_color_map
 from backup_utils import (
     create_backup_file,
-    restore_from_backup_data
+    restore_from_backup_data,
+    RESTORE_MAX_WORKERS
 )
 from modules.conditional_tags import conditional_tags_bp
 
@@ -236,6 +238,10 @@ def api_bulk_tag_update():
     
     if not operation or operation not in ["add", "remove"] or not target_tags or not selected_vms:
         return jsonify({"success": False, "error": "Missing or invalid data"}), 400
+
+    # Tags must be a list of strings (a bare string would become a set of characters)
+    if not isinstance(target_tags, list) or not all(isinstance(tag, str) for tag in target_tags):
+        return jsonify({"success": False, "error": "Missing or invalid data"}), 400
     
     try:
         # Track success and failures
@@ -245,6 +251,7 @@ def api_bulk_tag_update():
             "failed": 0,
             "failures": []
         }
+        remove_set = set(target_tags)
         
         # Process each selected VM
         for vm in selected_vms:
@@ -277,16 +284,18 @@ def api_bulk_tag_update():
                     continue  # Skip to next VM
             
             # Convert current tags to a list
-            current_tag_list = [tag.strip() for tag in current_tags.split(";") if tag.strip()] if current_tags else []
+            current_tag_list = parse_tags(current_tags)
             
             if operation == "add":
-                # Add new tags (avoid duplicates)
+                # Add new tags (avoid duplicates, keep existing order)
+                existing = set(current_tag_list)
                 for tag in target_tags:
-                    if tag and tag not in current_tag_list:
+                    if tag and tag not in existing:
+                        existing.add(tag)
                         current_tag_list.append(tag)
             else:  # Remove operation
                 # Remove specified tags
-                current_tag_list = [tag for tag in current_tag_list if tag not in target_tags]
+                current_tag_list = [tag for tag in current_tag_list if tag not in remove_set]
             
             # Convert back to semicolon-separated string
             # Filter out any empty tags to avoid whitespace issues
@@ -487,13 +496,27 @@ def restore_tags():
                     raise PermissionError("Sys.Modify required") from http_err
                 raise
 
+        # Fetch current tags once so VMs that already match the backup are skipped.
+        # If the listing fails, fall back to restoring every VM.
+        try:
+            current_vms = get_all_vms()
+        except Exception as e:
+            logging.warning(f"Could not fetch current VMs before restore: {e}")
+            current_vms = None
+
         # Use the utility function to restore tags (and optionally colors)
-        results = restore_from_backup_data(backup_data, update_vm_tags, _restore_tag_colors)
+        results = restore_from_backup_data(
+            backup_data, update_vm_tags, _restore_tag_colors, current_vms=current_vms,
+            max_workers=RESTORE_MAX_WORKERS
+        )
 
-        # Always treat it as a success if at least some VMs were updated
-        if results["updated"] > 0:
+        # Always treat it as a success if at least some VMs were updated or already matched
+        if results["updated"] > 0 or results["skipped"] > 0:
             message = f"Successfully restored tags for {results['updated']} VMs/containers"
 
+            if results["skipped"] > 0:
+                message += f" ({results['skipped']} already up to date)"
+
             # If there were failures, add that info to the message but still show as success
             if results["failed"] > 0:
                 message += f". {results['failed']} VMs/containers couldn't be updated (possibly deleted)."
@@ -3,9 +3,19 @@ import json
 import os
 from datetime import datetime, timezone
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from tag_utils import parse_tags
+
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
 
 BACKUP_FORMAT_VERSION = 2
 
+# Concurrent Proxmox API calls used by the restore route
+RESTORE_MAX_WORKERS = 8
+
 
 def create_backup_file(vms, color_map=None):
     """Generate a JSON file with all VM/CT tags and cluster tag colors.
@@ -32,15 +42,12 @@ def create_backup_file(vms, color_map=None):
     """
     vm_entries = []
     for vm in vms:
-        tags = []
-        if vm.get("tags"):
-            tags = [tag.strip() for tag in vm.get("tags", "").split(";") if tag.strip()]
         vm_entries.append({
             "id": vm.get("vmid"),
             "name": vm.get("name"),
             "node": vm.get("node"),
             "type": vm.get("type"),
-            "tags": tags,
+            "tags": parse_tags(vm.get("tags")),
         })
 
     backup_data = {
@@ -50,15 +57,24 @@ def create_backup_file(vms, color_map=None):
         "tag_colors": color_map or {},
     }
 
-    json_data = json.dumps(backup_data, indent=2)
-    buffer = BytesIO(json_data.encode('utf-8'))
+    if orjson is not None:
+        json_bytes = orjson.dumps(backup_data, option=orjson.OPT_INDENT_2)
+    else:
+        json_bytes = json.dumps(backup_data, indent=2).encode('utf-8')
+    buffer = BytesIO(json_bytes)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"proxmox_tags_backup_{timestamp}.json"
 
     return buffer, filename
 
-def restore_from_backup_data(backup_data, update_vm_tags_func, restore_tag_colors_func=None):
+def _tag_signature(tags_str):
+    """Order-insensitive signature of a tags string, used to spot no-op restores."""
+    return tuple(sorted(parse_tags(tags_str)))
+
+
+def restore_from_backup_data(backup_data, update_vm_tags_func, restore_tag_colors_func=None,
+                             current_vms=None, max_workers=1):
     """Restore tags (and optionally tag colors) from backup data.
 
     Accepts both formats:
@@ -73,10 +89,16 @@ def restore_from_backup_data(backup_data, update_vm_tags_func, restore_tag_color
             ignored (tags still restore). The callable should raise on
             permission errors with a ``permission_denied`` semantic that the
             caller catches; here we just record the error string.
+        current_vms: optional list of live VM dicts (as returned by
+            ``get_all_vms``). When given, VMs whose current tags already match
+            the backup are not re-sent and are counted in ``skipped`` instead.
+        max_workers: number of tag updates sent concurrently. The default of 1
+            sends them one after another; results are reported in backup
+            order either way.
 
     Returns:
         dict: Results with at minimum:
-            ``success``, ``updated``, ``failed``, ``failures``,
+            ``success``, ``updated``, ``skipped``, ``failed``, ``failures``,
             ``format_version`` (1 or 2),
             ``colors_restored`` (int | None — None when backup carried no
                 colors or no callback was provided),
@@ -103,13 +125,21 @@ def restore_from_backup_data(backup_data, update_vm_tags_func, restore_tag_color
         "success": True,
         "format_version": format_version,
         "updated": 0,
+        "skipped": 0,
         "failed": 0,
         "failures": [],
         "colors_restored": None,
         "colors_error": None,
     }
 
-    # Process each VM in the backup
+    # Signatures of the VMs' current tags, keyed by vmid
+    current_signatures = {
+        vm.get("vmid"): _tag_signature(vm.get("tags", ""))
+        for vm in current_vms or []
+    }
+
+    # Collect the VMs in the backup that need an update
+    pending = []
     for vm_data in vm_list:
         vmid = vm_data.get("id")
         node = vm_data.get("node")
@@ -124,11 +154,33 @@ def restore_from_backup_data(backup_data, update_vm_tags_func, restore_tag_color
         filtered_tags = [tag for tag in tags if tag.strip()]
         tags_str = ";".join(filtered_tags)
         
+        # Skip the API call when the VM already carries exactly these tags
+        if vmid in current_signatures and current_signatures[vmid] == _tag_signature(tags_str):
+            results["skipped"] += 1
+            continue
+        
+        pending.append((vm_data, vmid, node, tags_str, vm_type))
+    
+    def _send(job):
+        """Update one VM's tags, returning the exception instead of raising it"""
+        _, vmid, node, tags_str, vm_type = job
         try:
-            # Update the VM tags
             update_vm_tags_func(node, vmid, tags_str, vm_type)
-            results["updated"] += 1
         except Exception as e:
+            return e
+        return None
+    
+    # The Proxmox calls are network-bound, so overlap them when allowed
+    if max_workers > 1 and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+            outcomes = list(executor.map(_send, pending))
+    else:
+        outcomes = map(_send, pending)
+    
+    for (vm_data, vmid, *_), e in zip(pending, outcomes):
+        if e is None:
+            results["updated"] += 1
+        else:
             error_str = str(e)
             
             # Check if this is a "Configuration file does not exist" error (VM/container no longer exists)
@@ -3,9 +3,13 @@ Rule evaluation engine for conditional tagging
 """
 
 import re
+import json
 import time
 import logging
-from typing import Dict, List, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import gt, lt, ge, le
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from .models import (
     ConditionalRule, RuleCondition, OperatorType, 
     LogicalOperator, ExecutionResult
@@ -13,10 +17,57 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Relative cost of each operator; cheaper conditions are evaluated first so
+# AND/OR groups can short-circuit before reaching expensive ones
+_OPERATOR_COST = {
+    OperatorType.EQUALS: 0,
+    OperatorType.NOT_EQUALS: 0,
+    OperatorType.IN: 1,
+    OperatorType.NOT_IN: 1,
+    OperatorType.GREATER_THAN: 2,
+    OperatorType.LESS_THAN: 2,
+    OperatorType.GREATER_EQUALS: 2,
+    OperatorType.LESS_EQUALS: 2,
+    OperatorType.CONTAINS: 3,
+    OperatorType.NOT_CONTAINS: 3,
+    OperatorType.REGEX: 4,
+}
+
+MAX_REGEX_LENGTH = 1000
+
+# Concurrent Proxmox tag updates sent while applying a rule
+UPDATE_MAX_WORKERS = 8
+
+
+@lru_cache(maxsize=1024)
+def _compile_regex(pattern: str):
+    """Compile a rule regex once per distinct pattern; None if it is invalid"""
+    try:
+        return re.compile(pattern)
+    except re.error:
+        return None
+
+
+def _walk_path(value: Any, parts) -> Any:
+    """Follow already-split field path parts through nested dicts"""
+    for part in parts:
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return None
+    return value
+
+
 class RuleEngine:
     """Engine for evaluating conditional rules against VMs"""
     
-    def __init__(self):
+    COMPILED_CACHE_SIZE = 256  # Compiled condition groups kept per engine
+    
+    def __init__(self, max_workers: int = UPDATE_MAX_WORKERS):
+        self.max_workers = max_workers
+        # Compiled predicates keyed by condition content, so edited rules
+        # never hit a stale entry
+        self._compiled_cache: Dict[Tuple, Callable[[Dict[str, Any]], bool]] = {}
         self.operators = {
             OperatorType.EQUALS: self._op_equals,
             OperatorType.NOT_EQUALS: self._op_not_equals,
@@ -57,14 +108,18 @@ class RuleEngine:
             matched_vms = []
             non_matched_vms = []
             
+            matches = self._compile_conditions(rule.conditions)
+            debug = logger.isEnabledFor(logging.DEBUG)
+            
             for vm in vms:
-                vm_info = f"VM {vm.get('vmid')} ({vm.get('name')}) type={vm.get('type')}"
-                if self._evaluate_conditions(rule.conditions, vm):
+                if matches(vm):
                     matched_vms.append(vm)
-                    logger.debug(f"[ENGINE] {vm_info} MATCHED conditions")
+                    if debug:
+                        logger.debug(f"[ENGINE] VM {vm.get('vmid')} ({vm.get('name')}) type={vm.get('type')} MATCHED conditions")
                 else:
                     non_matched_vms.append(vm)
-                    logger.debug(f"[ENGINE] {vm_info} did NOT match conditions")
+                    if debug:
+                        logger.debug(f"[ENGINE] VM {vm.get('vmid')} ({vm.get('name')}) type={vm.get('type')} did NOT match conditions")
             
             result.matched_vms = [vm['vmid'] for vm in matched_vms]
             logger.info(f"[ENGINE] Condition evaluation complete: {len(matched_vms)} matched, {len(non_matched_vms)} not matched")
@@ -100,57 +155,150 @@ class RuleEngine:
     
     def _evaluate_conditions(self, condition_group, vm: Dict[str, Any]) -> bool:
         """Evaluate a group of conditions against a VM"""
-        if not condition_group.conditions:
-            return False
+        return self._compile_conditions(condition_group)(vm)
+    
+    def _compile_conditions(self, condition_group) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Compile a group of conditions into a single predicate over a VM
         
-        results = []
-        for condition in condition_group.conditions:
-            results.append(self._evaluate_condition(condition, vm))
+        Field paths and operator functions are resolved once per distinct
+        set of conditions instead of once per VM. Conditions are ordered
+        cheapest first; the stored rule keeps its original order.
+        """
+        key = self._conditions_key(condition_group)
+        if key is None:
+            return self._build_predicate(condition_group)
+        compiled = self._compiled_cache.get(key)
+        if compiled is None:
+            if len(self._compiled_cache) >= self.COMPILED_CACHE_SIZE:
+                self._compiled_cache.clear()
+            compiled = self._compiled_cache[key] = self._build_predicate(condition_group)
+        return compiled
+    
+    def _conditions_key(self, condition_group) -> Optional[Tuple]:
+        """
+        Build a hashable key describing a condition group and its operators,
+        or None if a condition can't be turned into one (the group is then
+        compiled without caching)
+        """
+        try:
+            key = (condition_group.operator, tuple(
+                (condition.field, condition.operator, self.operators.get(condition.operator),
+                 json.dumps(condition.value, sort_keys=True, default=str))
+                for condition in condition_group.conditions
+            ))
+            hash(key)
+        except (TypeError, ValueError):
+            # e.g. dict values with mixed key types can't be sorted by json.dumps
+            return None
+        return key
+    
+    def _build_predicate(self, condition_group) -> Callable[[Dict[str, Any]], bool]:
+        """Build the predicate for a condition group (see _compile_conditions)"""
+        ordered = sorted(condition_group.conditions,
+                         key=lambda condition: _OPERATOR_COST.get(condition.operator, 0))
+        predicates = [self._compile_condition(condition) for condition in ordered]
+        
+        if not predicates:
+            return lambda vm: False
+        if len(predicates) == 1:
+            return predicates[0]
         
         if condition_group.operator == LogicalOperator.AND:
-            return all(results)
+            return lambda vm: all(predicate(vm) for predicate in predicates)
         else:  # OR
-            return any(results)
+            return lambda vm: any(predicate(vm) for predicate in predicates)
     
-    def _evaluate_condition(self, condition: RuleCondition, vm: Dict[str, Any]) -> bool:
-        """Evaluate a single condition against a VM"""
-        # Get the field value from the VM
-        field_value = self._get_field_value(vm, condition.field)
-        
-        logger.debug(f"[ENGINE] Evaluating condition for VM {vm.get('vmid')} ({vm.get('name')}): "
-                    f"field='{condition.field}', operator='{condition.operator}', "
-                    f"value='{condition.value}', field_value='{field_value}'")
-        
-        # Get the appropriate operator function
+    def _compile_condition(self, condition: RuleCondition) -> Callable[[Dict[str, Any]], bool]:
+        """Compile a single condition into a predicate over a VM"""
         op_func = self.operators.get(condition.operator)
         if not op_func:
             logger.warning(f"[ENGINE] Unknown operator: {condition.operator}")
-            return False
+            return lambda vm: False
         
-        # Evaluate the condition
-        try:
-            result = op_func(field_value, condition.value)
-            logger.debug(f"[ENGINE] Condition result: {result}")
-            return result
-        except Exception as e:
-            logger.error(f"[ENGINE] Error evaluating condition: {e}")
-            return False
+        field_path = condition.field
+        compare_value = condition.value
+        test = (self._specialize_operator(op_func, compare_value)
+                or (lambda field_value: op_func(field_value, compare_value)))
+        
+        if '.' in field_path:
+            parts = tuple(field_path.split('.'))
+            get_value = lambda vm: _walk_path(vm, parts)
+        else:
+            get_value = lambda vm: vm.get(field_path)
+        
+        def predicate(vm: Dict[str, Any]) -> bool:
+            try:
+                return test(get_value(vm))
+            except Exception as e:
+                logger.error(f"[ENGINE] Error evaluating condition: {e}")
+                return False
+        
+        return predicate
+    
+    def _evaluate_condition(self, condition: RuleCondition, vm: Dict[str, Any]) -> bool:
+        """Evaluate a single condition against a VM"""
+        return self._compile_condition(condition)(vm)
+    
+    def _specialize_operator(self, op_func: Callable, compare_value: Any):
+        """
+        Return a test of a field value against compare_value with the compare
+        side prepared once, or None if op_func is not a built-in operator
+        """
+        if op_func == self._op_equals:
+            target = str(compare_value).lower()
+            return lambda field_value: str(field_value).lower() == target
+        if op_func == self._op_not_equals:
+            target = str(compare_value).lower()
+            return lambda field_value: str(field_value).lower() != target
+        if op_func == self._op_contains:
+            target = str(compare_value).lower()
+            return lambda field_value: target in str(field_value).lower()
+        if op_func == self._op_not_contains:
+            target = str(compare_value).lower()
+            return lambda field_value: target not in str(field_value).lower()
+        if op_func in (self._op_in, self._op_not_in):
+            values = compare_value if isinstance(compare_value, list) else [compare_value]
+            targets = {str(v).lower() for v in values}
+            if op_func == self._op_in:
+                return lambda field_value: str(field_value).lower() in targets
+            return lambda field_value: str(field_value).lower() not in targets
+        if op_func == self._op_regex:
+            # Invalid or oversized patterns take the generic path, which logs them
+            if not isinstance(compare_value, str) or len(compare_value) > MAX_REGEX_LENGTH:
+                return None
+            compiled = _compile_regex(compare_value)
+            if compiled is None:
+                return None
+            return lambda field_value: bool(compiled.search(str(field_value), endpos=10000))
+            
+        compare = {
+            self._op_greater_than: gt,
+            self._op_less_than: lt,
+            self._op_greater_equals: ge,
+            self._op_less_equals: le,
+        }.get(op_func)
+        if compare is not None:
+            try:
+                target = float(compare_value)
+            except (ValueError, TypeError):
+                return lambda field_value: False
+            
+            def numeric(field_value: Any) -> bool:
+                try:
+                    return compare(float(field_value), target)
+                except (ValueError, TypeError):
+                    return False
+            return numeric
+        
+        return None
     
     def _get_field_value(self, vm: Dict[str, Any], field_path: str) -> Any:
         """
         Get a field value from VM data, supporting nested paths
         e.g., "config.ostype" -> vm['config']['ostype']
         """
-        parts = field_path.split('.')
-        value = vm
-        
-        for part in parts:
-            if isinstance(value, dict) and part in value:
-                value = value[part]
-            else:
-                return None
-        
-        return value
+        return _walk_path(vm, field_path.split('.'))
     
     def _apply_then_actions(self, rule: ConditionalRule, vms: List[Dict[str, Any]],
                            result: ExecutionResult):
@@ -158,6 +306,7 @@ class RuleEngine:
         from proxmox_api import update_vm_tags
         from tag_utils import parse_tags, format_tags
 
+        updates = []
         for vm in vms:
             vmid = vm['vmid']
             node = vm['node']
@@ -187,14 +336,12 @@ class RuleEngine:
                         new_tags_lower.discard(tag_lower)
                         for t in removed:
                             result.tags_removed.setdefault(vmid, []).append(t)
-
+            
             # Update VM if tags changed
             if new_tags != current_tags:
-                try:
-                    formatted_tags = format_tags(new_tags)
-                    update_vm_tags(node, vmid, formatted_tags, vm_type)
-                except Exception as e:
-                    result.errors.append(f"Failed to update VM {vmid}: {e}")
+                updates.append((node, vmid, new_tags, vm_type))
+        
+        self._send_tag_updates(updates, result, update_vm_tags, format_tags)
     
     def _apply_else_actions(self, rule: ConditionalRule, vms: List[Dict[str, Any]],
                            result: ExecutionResult):
@@ -202,6 +349,7 @@ class RuleEngine:
         from proxmox_api import update_vm_tags
         from tag_utils import parse_tags, format_tags
 
+        updates = []
         for vm in vms:
             vmid = vm['vmid']
             node = vm['node']
@@ -231,14 +379,36 @@ class RuleEngine:
                         new_tags_lower.discard(tag_lower)
                         for t in removed:
                             result.tags_removed.setdefault(vmid, []).append(t)
-
+            
             # Update VM if tags changed
             if new_tags != current_tags:
-                try:
-                    formatted_tags = format_tags(new_tags)
-                    update_vm_tags(node, vmid, formatted_tags, vm_type)
-                except Exception as e:
-                    result.errors.append(f"Failed to update VM {vmid}: {e}")
+                updates.append((node, vmid, new_tags, vm_type))
+        
+        self._send_tag_updates(updates, result, update_vm_tags, format_tags)
+    
+    def _send_tag_updates(self, updates: List[Tuple], result: ExecutionResult,
+                          update_vm_tags: Callable, format_tags: Callable):
+        """
+        Send (node, vmid, tags, vm_type) updates to Proxmox
+        
+        The calls are network-bound, so up to max_workers run at once.
+        Failures are recorded in result.errors in VM order.
+        """
+        def send(update):
+            node, vmid, new_tags, vm_type = update
+            try:
+                update_vm_tags(node, vmid, format_tags(new_tags), vm_type)
+            except Exception as e:
+                return f"Failed to update VM {vmid}: {e}"
+            return None
+        
+        if self.max_workers > 1 and len(updates) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(updates))) as executor:
+                errors = list(executor.map(send, updates))
+        else:
+            errors = map(send, updates)
+        
+        result.errors.extend(error for error in errors if error)
     
     def _simulate_then_actions(self, rule: ConditionalRule, vms: List[Dict[str, Any]],
                               result: ExecutionResult):
@@ -334,14 +504,14 @@ class RuleEngine:
             return False
     
     def _op_regex(self, field_value: Any, pattern: str) -> bool:
-        try:
-            if len(pattern) > 1000:
-                logger.error(f"Regex pattern too long: {len(pattern)} chars")
-                return False
-            return bool(re.compile(pattern).search(str(field_value), endpos=10000))
-        except re.error:
+        if len(pattern) > MAX_REGEX_LENGTH:
+            logger.error(f"Regex pattern too long: {len(pattern)} chars")
+            return False
+        compiled = _compile_regex(pattern)
+        if compiled is None:
             logger.error(f"Invalid regex pattern: {pattern}")
             return False
+        return bool(compiled.search(str(field_value), endpos=10000))
     
     def _op_in(self, field_value: Any, compare_list: List[Any]) -> bool:
         if not isinstance(compare_list, list):
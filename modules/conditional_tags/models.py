@@ -4,6 +4,7 @@ Data models and validation for conditional tagging rules
 
 import uuid
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 from enum import Enum
 
@@ -26,12 +27,32 @@ class LogicalOperator(Enum):
     AND = "AND"
     OR = "OR"
 
+# Operator lookups by string value, built once instead of going through Enum.__call__
+_OPERATOR_TYPES = {op.value: op for op in OperatorType}
+_LOGICAL_OPERATORS = {op.value: op for op in LogicalOperator}
+
+@lru_cache(maxsize=256)
+def _cron_error(cron: str) -> Optional[str]:
+    """Parse a crontab expression once per distinct string; the error text or None"""
+    try:
+        from apscheduler.triggers.cron import CronTrigger
+        CronTrigger.from_crontab(cron)
+    except Exception as e:
+        return str(e)
+    return None
+
 class RuleCondition:
     """Represents a single condition in a rule"""
     
+    __slots__ = ('field', 'operator', 'value')
+    
     def __init__(self, field: str, operator: str, value: Any):
         self.field = field
-        self.operator = OperatorType(operator)
+        try:
+            self.operator = _OPERATOR_TYPES[operator]
+        except (KeyError, TypeError):
+            # Enum members pass through; unknown values raise ValueError
+            self.operator = OperatorType(operator)
         self.value = value
     
     def to_dict(self) -> Dict[str, Any]:
@@ -52,8 +73,13 @@ class RuleCondition:
 class RuleConditionGroup:
     """Group of conditions with a logical operator"""
     
+    __slots__ = ('operator', 'conditions')
+    
     def __init__(self, operator: str = "AND", conditions: Optional[List[Dict]] = None):
-        self.operator = LogicalOperator(operator)
+        try:
+            self.operator = _LOGICAL_OPERATORS[operator]
+        except (KeyError, TypeError):
+            self.operator = LogicalOperator(operator)
         self.conditions = []
         if conditions:
             for cond in conditions:
@@ -81,6 +107,8 @@ class RuleConditionGroup:
 class RuleAction:
     """Actions to perform when rule conditions are met or not met"""
     
+    __slots__ = ('add_tags', 'remove_tags', 'else_add_tags', 'else_remove_tags')
+    
     def __init__(self, add_tags: Optional[List[str]] = None, 
                  remove_tags: Optional[List[str]] = None,
                  else_add_tags: Optional[List[str]] = None,
@@ -112,6 +140,8 @@ class RuleAction:
 class RuleSchedule:
     """Schedule configuration for automated rule execution"""
     
+    __slots__ = ('enabled', 'cron')
+    
     def __init__(self, enabled: bool = False, cron: str = ""):
         self.enabled = enabled
         self.cron = cron
@@ -132,6 +162,9 @@ class RuleSchedule:
 class ConditionalRule:
     """Complete conditional tagging rule"""
     
+    __slots__ = ('id', 'name', 'description', 'enabled', 'conditions', 'actions',
+                 'schedule', 'created_at', 'updated_at', 'last_run', 'stats')
+    
     def __init__(self, name: str, description: str = "", enabled: bool = True,
                  conditions: Optional[RuleConditionGroup] = None,
                  actions: Optional[RuleAction] = None,
@@ -144,8 +177,7 @@ class ConditionalRule:
         self.conditions = conditions or RuleConditionGroup()
         self.actions = actions or RuleAction()
         self.schedule = schedule or RuleSchedule()
-        self.created_at = datetime.now(timezone.utc)
-        self.updated_at = datetime.now(timezone.utc)
+        self.created_at = self.updated_at = datetime.now(timezone.utc)
         self.last_run = None
         self.stats = {
             "total_matches": 0,
@@ -171,25 +203,18 @@ class ConditionalRule:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ConditionalRule':
+        # Build the parts first so the constructor doesn't create defaults
+        # that would be thrown away
         rule = cls(
             name=data["name"],
             description=data.get("description", ""),
             enabled=data.get("enabled", True),
+            conditions=RuleConditionGroup.from_dict(data["conditions"]) if "conditions" in data else None,
+            actions=RuleAction.from_dict(data["actions"]) if "actions" in data else None,
+            schedule=RuleSchedule.from_dict(data["schedule"]) if "schedule" in data else None,
             rule_id=data.get("id")
         )
         
-        # Set conditions
-        if "conditions" in data:
-            rule.conditions = RuleConditionGroup.from_dict(data["conditions"])
-        
-        # Set actions
-        if "actions" in data:
-            rule.actions = RuleAction.from_dict(data["actions"])
-        
-        # Set schedule
-        if "schedule" in data:
-            rule.schedule = RuleSchedule.from_dict(data["schedule"])
-        
         # Set timestamps
         if "created_at" in data:
             rule.created_at = datetime.fromisoformat(data["created_at"])
@@ -224,17 +249,20 @@ class ConditionalRule:
                 errors.append("Cron expression is required when schedule is enabled")
             else:
                 # Validate cron syntax
-                try:
-                    from apscheduler.triggers.cron import CronTrigger
-                    CronTrigger.from_crontab(self.schedule.cron)
-                except Exception as e:
-                    errors.append(f"Invalid cron expression: {e}")
+                cron_error = (_cron_error(self.schedule.cron) if isinstance(self.schedule.cron, str)
+                              else "must be a string")
+                if cron_error:
+                    errors.append(f"Invalid cron expression: {cron_error}")
         
         return errors
 
 class ExecutionResult:
     """Result of rule execution"""
     
+    __slots__ = ('rule_id', 'rule_name', 'success', 'timestamp', 'matched_vms',
+                 'tags_added', 'tags_removed', 'tags_already_present', 'errors',
+                 'execution_time', 'dry_run')
+    
     def __init__(self, rule_id: str, rule_name: str = "", success: bool = True):
         self.rule_id = rule_id
         self.rule_name = rule_name
@@ -39,7 +39,7 @@ def get_vm_config(node: str, vmid: int, vm_type: str = "qemu") -> dict:
     headers = _get_headers()
     verify_ssl = load_config().get("VERIFY_SSL", True)
 
-    response = requests.get(url, headers=headers, verify=verify_ssl)
+    response = requests.get(url, headers=headers, verify=verify_ssl, timeout=5)
     response.raise_for_status()
     return response.json().get("data", {})
 
@@ -135,6 +135,7 @@ def main():
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--failfast", "-x", action="store_true", help="Stop on first failure")
     parser.add_argument("--pattern", "-k", help="Run tests matching pattern")
+    parser.add_argument("--workers", "-n", help="Run tests across N pytest-xdist workers (or 'auto')")
     
     args = parser.parse_args()
     
@@ -164,6 +165,11 @@ def main():
     if args.pattern:
         cmd.extend(["-k", args.pattern])
     
+    # Spread tests across workers; classes that write tags on the live test VM
+    # share the "live_writes" xdist group, so they all run on one worker
+    if args.workers:
+        cmd.extend(["-n", args.workers, "--dist=loadgroup"])
+    
     # Add test markers
     if args.unit and not args.integration and not args.live and not args.templates:
         cmd.extend(["-m", "unit"])
@@ -1,5 +1,7 @@
+import heapq
 import logging
 import re
+from functools import lru_cache
 
 # Proxmox tag-name pattern (PVE/JSONSchema.pm: PVE_TAG_RE).
 TAG_NAME_RE = re.compile(r'^[a-z0-9_][a-z0-9_\-\+\.]*$')
@@ -19,7 +21,13 @@ def parse_tags(tags_string: str) -> list:
     if not tags_string or not isinstance(tags_string, str):
         return []
     
-    return [tag.strip() for tag in tags_string.split(";") if tag.strip()]
+    # Callers mutate the returned list, so hand out a fresh copy of the cached tuple
+    return list(_split_tags(tags_string))
+
+@lru_cache(maxsize=2048)
+def _split_tags(tags_string: str) -> tuple:
+    """Cached split of a tags string; the same strings recur across VMs."""
+    return tuple(filter(None, map(str.strip, tags_string.split(";"))))
 
 def format_tags(tags_list: list) -> str:
     """
@@ -34,27 +42,39 @@ def format_tags(tags_list: list) -> str:
     if not tags_list:
         return ""
     
-    # Filter out empty/None tags and strip whitespace
-    clean_tags = [str(tag).strip() for tag in tags_list if tag and str(tag).strip()]
+    tags = tuple(tags_list)
+    # Only cache pure-string input: lru_cache would treat (1,) and (True,) as the same key
+    if all(isinstance(tag, str) for tag in tags):
+        return _join_tags(tags)
+    return _join_tags.__wrapped__(tags)
+
+@lru_cache(maxsize=2048)
+def _join_tags(tags: tuple) -> str:
+    """Filter out empty/None tags, strip whitespace and join with semicolons."""
+    clean_tags = [str(tag).strip() for tag in tags if tag and str(tag).strip()]
     return ";".join(clean_tags)
 
-def extract_tags(vm_list: list) -> list:
+def extract_tags(vm_list: list, limit: int = None) -> list:
     """
     Collect and deduplicate tags across all VMs.
     
     Args:
         vm_list (list): List of VM dictionaries containing tag information
-        
+        limit (int, optional): Only return the first ``limit`` tags in sort order
+    
     Returns:
         list: Sorted list of unique tags
     """
     try:
-        all_tags = set()
-        for vm in vm_list:
-            tags = vm.get("tags", "")
-            if isinstance(tags, str) and tags.strip():
-                all_tags.update(tag.strip() for tag in tags.split(";") if tag.strip())
-        return sorted(all_tags)
+        # One split over all tag strings instead of one per VM
+        joined = ";".join(
+            tags for tags in (vm.get("tags", "") for vm in vm_list)
+            if isinstance(tags, str) and tags
+        )
+        unique_tags = set(filter(None, map(str.strip, joined.split(";"))))
+        if limit is None:
+            return sorted(unique_tags)
+        return heapq.nsmallest(limit, unique_tags)
     except Exception as e:
         logging.error(f"Error extracting tags: {str(e)}")
         return []
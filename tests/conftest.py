@@ -23,7 +23,7 @@ except ImportError:
 try:
     from .simple_live_config import (
         simple_live_test_config, simple_live_proxmox_config,
-        all_vms, first_vm, skip_live_tests_if_disabled
+        all_vms, first_vm, vm_indexes, skip_live_tests_if_disabled
     )
 except ImportError:
     # Fallback if simple_live_config is not available
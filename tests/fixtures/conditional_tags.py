@@ -20,7 +20,7 @@ def sample_rule_condition():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_rule_condition_group():
     """Sample rule condition group for testing"""
     conditions = [
@@ -38,7 +38,7 @@ def sample_rule_condition_group():
     return RuleConditionGroup(operator="AND", conditions=conditions)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_rule_action():
     """Sample rule action for testing"""
     return RuleAction(
@@ -49,7 +49,7 @@ def sample_rule_action():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_rule_schedule():
     """Sample rule schedule for testing"""
     return RuleSchedule(
@@ -58,9 +58,9 @@ def sample_rule_schedule():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_conditional_rule(sample_rule_condition_group, sample_rule_action, sample_rule_schedule):
-    """Sample complete conditional rule for testing"""
+    """Sample complete conditional rule for testing (shared read-only per module)"""
     return ConditionalRule(
         name="Test Production Monitoring Rule",
         description="Add monitoring tags to running production VMs",
@@ -32,6 +32,7 @@ from tests.live_config import (
 )
 
 
+@pytest.mark.xdist_group("live_writes")
 class TestLiveConditionalTagging:
     """Live conditional tagging integration tests"""
     
@@ -115,8 +116,7 @@ class TestLiveConditionalTagging:
         
         finally:
             # Always restore original state
-            if not live_config.dry_run_only:
-                backup_manager.restore_all()
+            backup_manager.restore_all()
     
     @pytest.mark.live
     def test_complex_conditions_live(self, live_proxmox_config, test_vms, temp_storage_file):
@@ -262,8 +262,7 @@ class TestLiveConditionalTagging:
         
         finally:
             # Restore any changes made for test setup
-            if not live_config.dry_run_only and backup_manager.backups:
-                backup_manager.restore_all()
+            backup_manager.restore_all()
     
     @pytest.mark.live
     def test_rule_scheduling_simulation_live(self, live_proxmox_config, test_vms, temp_storage_file):
@@ -599,8 +598,7 @@ class TestLiveConditionalTagging:
         
         finally:
             # Always restore VM states
-            if not live_config.dry_run_only:
-                backup_manager.restore_all()
+            backup_manager.restore_all()
 
 
 class TestLiveConditionalTaggingEdgeCases:
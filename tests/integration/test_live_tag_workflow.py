@@ -25,10 +25,11 @@ import backup_utils
 # Import live testing utilities
 from tests.live_config import (
     live_config, TagBackupManager, generate_test_tags,
-    safe_tag_update, validate_proxmox_connection
+    assert_tags_applied, validate_proxmox_connection
 )
 
 
+@pytest.mark.xdist_group("live_writes")
 class TestLiveTagWorkflow:
     """Live end-to-end tag workflow tests"""
     
@@ -39,36 +40,20 @@ class TestLiveTagWorkflow:
         
         # Backup original state
         tag_backup.backup_vm_tags(vm)
-        original_tags = vm.get("tags", "")
         
         try:
-            # Step 1: Generate and format test tags
+            # Step 1: Generate test tags
             test_tags_list = generate_test_tags()[:3]
-            formatted_tags = tag_utils.format_tags(test_tags_list)
             
-            # Step 2: Update VM with new tags
-            result = safe_tag_update(
-                vm["node"], vm["vmid"], formatted_tags, vm["type"], tag_backup
-            )
+            # Step 2: Format, update and verify all test tags are present
+            assert_tags_applied(vm, tag_backup, test_tags_list)
             
             if not live_config.dry_run_only:
-                assert "data" in result
-                
-                # Wait for Proxmox to process
-                time.sleep(2)
-                
-                # Step 3: Fetch updated config and verify
+                # Step 3: Fetch updated config
                 updated_config = proxmox_api.get_vm_config(vm["node"], vm["vmid"])
                 retrieved_tags = updated_config.get("tags", "")
                 
-                # Step 4: Parse retrieved tags and verify
-                parsed_tags = tag_utils.parse_tags(retrieved_tags)
-                
-                # All test tags should be present
-                for test_tag in test_tags_list:
-                    assert test_tag in parsed_tags, f"Tag {test_tag} not found in retrieved tags"
-                
-                # Step 5: Test tag extraction
+                # Step 4: Test tag extraction
                 extracted_tags = tag_utils.extract_tags_from_vms([{
                     **vm,
                     "tags": retrieved_tags
@@ -79,8 +64,7 @@ class TestLiveTagWorkflow:
             
         finally:
             # Always restore original state
-            if not live_config.dry_run_only:
-                tag_backup.restore_vm_tags(vm["vmid"])
+            tag_backup.restore_vm_tags(vm["vmid"])
     
     @pytest.mark.live
     def test_tag_merge_operations_live(self, live_proxmox_config, safe_test_vm, tag_backup):
@@ -89,22 +73,13 @@ class TestLiveTagWorkflow:
         
         # Backup original state
         tag_backup.backup_vm_tags(vm)
-        original_tags = vm.get("tags", "")
-        original_tags_list = tag_utils.parse_tags(original_tags)
         
         try:
             # Step 1: Add some base tags
             base_test_tags = generate_test_tags()[:2]
-            base_tags_str = tag_utils.format_tags(base_test_tags)
-            
-            result1 = safe_tag_update(
-                vm["node"], vm["vmid"], base_tags_str, vm["type"], tag_backup
-            )
+            assert_tags_applied(vm, tag_backup, base_test_tags)
             
             if not live_config.dry_run_only:
-                assert "data" in result1
-                time.sleep(1)
-                
                 # Step 2: Merge additional tags
                 additional_tags = [generate_test_tags()[2]]  # Third test tag
                 
@@ -112,48 +87,24 @@ class TestLiveTagWorkflow:
                 current_config = proxmox_api.get_vm_config(vm["node"], vm["vmid"])
                 current_tags = tag_utils.parse_tags(current_config.get("tags", ""))
                 
-                merged_tags = list(set(current_tags + additional_tags))
-                merged_tags_str = tag_utils.format_tags(merged_tags)
-                
-                result2 = safe_tag_update(
-                    vm["node"], vm["vmid"], merged_tags_str, vm["type"], tag_backup
-                )
-                
-                assert "data" in result2
-                time.sleep(1)
+                merged_tags = list(dict.fromkeys([*current_tags, *additional_tags]))
                 
-                # Step 3: Verify merged result
-                final_config = proxmox_api.get_vm_config(vm["node"], vm["vmid"])
-                final_tags = tag_utils.parse_tags(final_config.get("tags", ""))
+                # Step 3: Apply merged result - should contain all base tags plus additional
+                assert_tags_applied(vm, tag_backup, merged_tags)
                 
-                # Should contain all base tags plus additional
-                for tag in base_test_tags + additional_tags:
-                    assert tag in final_tags
-                
-                # Step 4: Test tag removal
-                tags_to_keep = base_test_tags  # Remove additional tags
-                keep_tags_str = tag_utils.format_tags(tags_to_keep)
-                
-                result3 = safe_tag_update(
-                    vm["node"], vm["vmid"], keep_tags_str, vm["type"], tag_backup
-                )
-                
-                assert "data" in result3
-                time.sleep(1)
+                # Step 4: Test tag removal (keep base tags, drop additional tags)
+                assert_tags_applied(vm, tag_backup, base_test_tags)
                 
                 # Verify removal
                 final_config2 = proxmox_api.get_vm_config(vm["node"], vm["vmid"])
                 final_tags2 = tag_utils.parse_tags(final_config2.get("tags", ""))
                 
-                for tag in base_test_tags:
-                    assert tag in final_tags2
                 for tag in additional_tags:
                     assert tag not in final_tags2
         
         finally:
             # Restore original state
-            if not live_config.dry_run_only:
-                tag_backup.restore_vm_tags(vm["vmid"])
+            tag_backup.restore_vm_tags(vm["vmid"])
     
     @pytest.mark.live
     def test_bulk_tag_operations_live(self, live_proxmox_config, test_vms, tag_backup):
@@ -168,48 +119,21 @@ class TestLiveTagWorkflow:
         tag_backup.backup_multiple_vms(target_vms)
         
         try:
-            # Step 1: Apply same tags to multiple VMs
+            # Step 1: Apply same tags to multiple VMs and verify each has them
             bulk_test_tags = generate_test_tags()[:2]
-            bulk_tags_str = tag_utils.format_tags(bulk_test_tags)
-            
-            results = []
             for vm in target_vms:
-                result = safe_tag_update(
-                    vm["node"], vm["vmid"], bulk_tags_str, vm["type"], tag_backup
-                )
-                results.append(result)
+                assert_tags_applied(vm, tag_backup, bulk_test_tags)
             
             if not live_config.dry_run_only:
-                # All updates should succeed
-                for result in results:
-                    assert "data" in result
-                
-                time.sleep(2)
-                
-                # Step 2: Verify all VMs have the tags
-                for vm in target_vms:
-                    config = proxmox_api.get_vm_config(vm["node"], vm["vmid"])
-                    vm_tags = tag_utils.parse_tags(config.get("tags", ""))
-                    
-                    for test_tag in bulk_test_tags:
-                        assert test_tag in vm_tags
-                
-                # Step 3: Test selective bulk updates
+                # Step 2: Test selective bulk updates
                 # Add different tags to each VM
+                suffix = datetime.now().strftime('%H%M%S%f')
                 for i, vm in enumerate(target_vms):
-                    specific_tag = f"vm-specific-{i+1}-{datetime.now().strftime('%H%M%S')}"
+                    specific_tag = f"vm-specific-{i+1}-{suffix}"
                     current_config = proxmox_api.get_vm_config(vm["node"], vm["vmid"])
                     current_tags = tag_utils.parse_tags(current_config.get("tags", ""))
                     
-                    updated_tags = current_tags + [specific_tag]
-                    updated_tags_str = tag_utils.format_tags(updated_tags)
-                    
-                    result = safe_tag_update(
-                        vm["node"], vm["vmid"], updated_tags_str, vm["type"], tag_backup
-                    )
-                    assert "data" in result
-                
-                time.sleep(1)
+                    assert_tags_applied(vm, tag_backup, current_tags + [specific_tag])
                 
                 # Verify specific tags
                 for i, vm in enumerate(target_vms):
@@ -217,13 +141,12 @@ class TestLiveTagWorkflow:
                     vm_tags = tag_utils.parse_tags(config.get("tags", ""))
                     
                     expected_specific_tag = f"vm-specific-{i+1}"
-                    matching_tags = [tag for tag in vm_tags if expected_specific_tag in tag]
-                    assert len(matching_tags) > 0, f"VM {vm['vmid']} missing specific tag"
+                    assert any(expected_specific_tag in tag for tag in vm_tags), \
+                        f"VM {vm['vmid']} missing specific tag"
         
         finally:
             # Restore all VMs
-            if not live_config.dry_run_only:
-                tag_backup.restore_all()
+            tag_backup.restore_all()
     
     @pytest.mark.live
     def test_tag_backup_restore_workflow_live(self, live_proxmox_config, safe_test_vm):
@@ -308,11 +231,7 @@ class TestLiveTagWorkflow:
             
             # Test 3: Live update with edge cases
             if not live_config.dry_run_only and cleaned_tags:
-                result = safe_tag_update(
-                    vm["node"], vm["vmid"], edge_tags_str, vm["type"], tag_backup
-                )
-                assert "data" in result
-                time.sleep(1)
+                assert_tags_applied(vm, tag_backup, cleaned_tags)
                 
                 # Verify edge case handling
                 config = proxmox_api.get_vm_config(vm["node"], vm["vmid"])
@@ -323,8 +242,7 @@ class TestLiveTagWorkflow:
         
         finally:
             # Restore original state
-            if not live_config.dry_run_only:
-                tag_backup.restore_vm_tags(vm["vmid"])
+            tag_backup.restore_vm_tags(vm["vmid"])
     
     @pytest.mark.live
     def test_error_handling_workflow_live(self, live_proxmox_config, test_vms):
@@ -375,39 +293,18 @@ class TestLiveTagWorkflow:
             test_tags1 = generate_test_tags()[:2]
             test_tags2 = [generate_test_tags()[2]]  # Different tag
             
-            tags_str1 = tag_utils.format_tags(test_tags1)
-            tags_str2 = tag_utils.format_tags(test_tags2)
-            
             if not live_config.dry_run_only:
-                # Update both VMs rapidly
-                result1 = safe_tag_update(
-                    vm1["node"], vm1["vmid"], tags_str1, vm1["type"], tag_backup
-                )
-                result2 = safe_tag_update(
-                    vm2["node"], vm2["vmid"], tags_str2, vm2["type"], tag_backup
-                )
-                
-                # Both should succeed
-                assert "data" in result1
-                assert "data" in result2
-                
-                time.sleep(2)
+                # Update both VMs rapidly; VM1 should have test_tags1, VM2 test_tags2
+                assert_tags_applied(vm1, tag_backup, test_tags1)
+                assert_tags_applied(vm2, tag_backup, test_tags2)
                 
-                # Verify both VMs have correct tags
+                # Re-read both VMs
                 config1 = proxmox_api.get_vm_config(vm1["node"], vm1["vmid"])
                 config2 = proxmox_api.get_vm_config(vm2["node"], vm2["vmid"])
                 
                 tags1 = tag_utils.parse_tags(config1.get("tags", ""))
                 tags2 = tag_utils.parse_tags(config2.get("tags", ""))
                 
-                # VM1 should have test_tags1
-                for tag in test_tags1:
-                    assert tag in tags1
-                
-                # VM2 should have test_tags2
-                for tag in test_tags2:
-                    assert tag in tags2
-                
                 # VMs should not have each other's exclusive tags
                 for tag in test_tags2:
                     assert tag not in tags1
@@ -416,8 +313,7 @@ class TestLiveTagWorkflow:
         
         finally:
             # Restore both VMs
-            if not live_config.dry_run_only:
-                tag_backup.restore_all()
+            tag_backup.restore_all()
     
     @pytest.mark.live
     def test_tag_persistence_live(self, live_proxmox_config, safe_test_vm, tag_backup):
@@ -430,35 +326,21 @@ class TestLiveTagWorkflow:
         try:
             # Step 1: Set tags
             persistence_tags = generate_test_tags()[:2]
-            tags_str = tag_utils.format_tags(persistence_tags)
             
             if not live_config.dry_run_only:
-                result = safe_tag_update(
-                    vm["node"], vm["vmid"], tags_str, vm["type"], tag_backup
-                )
-                assert "data" in result
-                time.sleep(1)
+                assert_tags_applied(vm, tag_backup, persistence_tags)
                 
-                # Step 2: Verify immediate persistence
+                # Step 2: Read back the persisted tags
                 config1 = proxmox_api.get_vm_config(vm["node"], vm["vmid"])
                 tags1 = tag_utils.parse_tags(config1.get("tags", ""))
                 
-                for tag in persistence_tags:
-                    assert tag in tags1
-                
-                # Step 3: Wait and verify persistence over time
-                time.sleep(3)
-                
+                # Step 3: Re-read and verify the stored tags are stable
                 config2 = proxmox_api.get_vm_config(vm["node"], vm["vmid"])
-                tags2 = tag_utils.parse_tags(config2.get("tags", ""))
-                
-                # Tags should still be there
-                for tag in persistence_tags:
-                    assert tag in tags2
+                assert tag_utils.parse_tags(config2.get("tags", "")) == tags1
                 
                 # Step 4: Verify through VM list API
-                all_vms = proxmox_api.get_all_vms()
-                target_vm = next((v for v in all_vms if v["vmid"] == vm["vmid"]), None)
+                vms_by_id = {v["vmid"]: v for v in proxmox_api.get_all_vms()}
+                target_vm = vms_by_id.get(vm["vmid"])
                 
                 if target_vm:
                     list_tags = tag_utils.parse_tags(target_vm.get("tags", ""))
@@ -467,8 +349,7 @@ class TestLiveTagWorkflow:
         
         finally:
             # Restore original state
-            if not live_config.dry_run_only:
-                tag_backup.restore_vm_tags(vm["vmid"])
+            tag_backup.restore_vm_tags(vm["vmid"])
 
 
 class TestLiveTagUtilityFunctions:
@@ -513,33 +394,4 @@ class TestLiveTagUtilityFunctions:
             reparsed_tags = tag_utils.parse_tags(reformatted_tags)
             
             # Should maintain tag content (order may differ)
-            assert set(parsed_tags) == set(reparsed_tags)
-    
-    @pytest.mark.live
-    def test_tag_normalization_live(self, live_proxmox_config):
-        """Test tag normalization with live-like data"""
-        # Test various tag formats that might come from live systems
-        test_cases = [
-            "production;web;frontend",  # Standard format
-            "production; web ; frontend",  # With spaces
-            "production;;web;frontend",  # Double semicolons
-            ";production;web;frontend;",  # Leading/trailing semicolons
-            "PRODUCTION;Web;FrontEnd",  # Mixed case
-        ]
-        
-        for tags_str in test_cases:
-            parsed = tag_utils.parse_tags(tags_str)
-            formatted = tag_utils.format_tags(parsed)
-            
-            # Should be valid format
-            assert isinstance(formatted, str)
-            
-            # Should not have empty tags
-            reparsed = tag_utils.parse_tags(formatted)
-            assert all(tag.strip() for tag in reparsed)
-            
-            # Should contain expected tag content
-            expected_tags = {"production", "web", "frontend"}
-            # Case handling depends on implementation
-            normalized_tags = {tag.lower() for tag in reparsed if tag.strip()}
-            assert expected_tags.issubset(normalized_tags) or expected_tags == {tag for tag in reparsed if tag.strip()}
\ No newline at end of file
+            assert set(parsed_tags) == set(reparsed_tags)
\ No newline at end of file
@@ -60,9 +60,8 @@ class TestTagWorkflowIntegration:
         buffer, filename = create_backup_file(sample_vms)
         
         # Verify backup format
-        buffer.seek(0)
         import json
-        backup_data = json.loads(buffer.read().decode('utf-8'))
+        backup_data = json.loads(buffer.getvalue())
         
         assert len(backup_data) == len(sample_vms)
         
@@ -147,14 +146,11 @@ class TestTagWorkflowIntegration:
         # Simulate bulk add operation - add "monitoring" to all VMs
         updated_vms = []
         for vm in vms:
-            current_tags = parse_tags(vm["tags"])
-            if "monitoring" not in current_tags:
-                current_tags.append("monitoring")
-            new_tags_str = format_tags(current_tags)
+            current_tags = set(parse_tags(vm["tags"]))
+            current_tags.add("monitoring")
+            new_tags_str = format_tags(sorted(current_tags))
             
-            updated_vm = vm.copy()
-            updated_vm["tags"] = new_tags_str
-            updated_vms.append(updated_vm)
+            updated_vms.append({**vm, "tags": new_tags_str})
         
         # Verify all VMs now have monitoring tag
         for vm in updated_vms:
@@ -164,14 +160,11 @@ class TestTagWorkflowIntegration:
         # Simulate bulk remove operation - remove "production" from all VMs
         final_vms = []
         for vm in updated_vms:
-            current_tags = parse_tags(vm["tags"])
-            if "production" in current_tags:
-                current_tags.remove("production")
-            new_tags_str = format_tags(current_tags)
+            current_tags = set(parse_tags(vm["tags"]))
+            current_tags.discard("production")
+            new_tags_str = format_tags(sorted(current_tags))
             
-            final_vm = vm.copy()
-            final_vm["tags"] = new_tags_str
-            final_vms.append(final_vm)
+            final_vms.append({**vm, "tags": new_tags_str})
         
         # Verify production tag was removed but others preserved
         for vm in final_vms:
@@ -333,9 +326,8 @@ class TestTagWorkflowWithProxmoxApi:
         mock_update_vm_tags.return_value = {"data": "success"}
         
         # Parse backup
-        buffer.seek(0)
         import json
-        backup_data = json.loads(buffer.read().decode('utf-8'))
+        backup_data = json.loads(buffer.getvalue())
         
         # Restore using actual API function
         from proxmox_api import update_vm_tags
@@ -13,19 +13,36 @@ Safety Features:
 """
 
 import os
+import re
+import time
 import pytest
 import json
-from typing import Dict, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, List, NamedTuple, Optional, Set
 from datetime import datetime
 from unittest.mock import patch
 import config
 import proxmox_api
 import tag_utils
 
+# Formatted once per test session; tags only need to be unique per run
+_SESSION_STARTED = datetime.now()
+_SESSION_ISO = _SESSION_STARTED.isoformat()
+_SESSION_STAMP = _SESSION_STARTED.strftime("%Y%m%d-%H%M%S")
+
+
+def _compile_indicators(words) -> "re.Pattern":
+    """Compile indicator words into a single alternation, longest first"""
+    return re.compile('|'.join(map(re.escape, sorted(words, key=len, reverse=True))))
+
 
 class LiveTestConfig:
     """Configuration for live Proxmox testing"""
     
+    SAFETY_INDICATORS = ('test', 'dev', 'staging', 'sandbox')
+    PRODUCTION_INDICATORS = ('prod', 'production', 'live', 'master', 'main')
+    
     def __init__(self):
         self.enabled = os.getenv('PROXTAGGER_LIVE_TESTS', 'false').lower() == 'true'
         self.backup_tags = os.getenv('PROXTAGGER_BACKUP_TAGS', 'true').lower() == 'true'
@@ -33,6 +50,10 @@ class LiveTestConfig:
         self.max_test_vms = int(os.getenv('PROXTAGGER_MAX_TEST_VMS', '10'))
         self.dry_run_only = os.getenv('PROXTAGGER_DRY_RUN_ONLY', 'false').lower() == 'true'
         
+        # Safety/production indicators, matched against the lowercased VM name
+        self._safety_re = _compile_indicators(self.SAFETY_INDICATORS)
+        self._prod_re = _compile_indicators(self.PRODUCTION_INDICATORS)
+        
         # Load actual Proxmox configuration
         try:
             self.proxmox_config = config.load_config()
@@ -56,17 +77,8 @@ class LiveTestConfig:
         if not name.startswith(self.test_vm_prefix):
             return False
         
-        # Additional safety checks
-        safety_indicators = ['test', 'dev', 'staging', 'sandbox']
-        if not any(indicator in name for indicator in safety_indicators):
-            return False
-        
-        # Avoid production indicators
-        production_indicators = ['prod', 'production', 'live', 'master', 'main']
-        if any(indicator in name for indicator in production_indicators):
-            return False
-        
-        return True
+        # Must carry a safety indicator and no production indicator
+        return self._safety_re.search(name) is not None and self._prod_re.search(name) is None
     
     def get_test_vms(self) -> List[Dict]:
         """Get VMs suitable for testing"""
@@ -75,66 +87,71 @@ class LiveTestConfig:
         
         try:
             all_vms = proxmox_api.get_all_vms()
-            test_vms = [vm for vm in all_vms if self.is_test_vm(vm)]
             
-            # Limit number of test VMs
-            if len(test_vms) > self.max_test_vms:
-                test_vms = test_vms[:self.max_test_vms]
-            
-            return test_vms
+            # Stop scanning once the test VM limit is reached
+            return list(islice(filter(self.is_test_vm, all_vms), self.max_test_vms))
         except Exception as e:
             print(f"Warning: Could not fetch test VMs: {e}")
             return []
 
 
+class BackupEntry(NamedTuple):
+    """Backed up tag state of a single VM (see TagBackupManager.backup_timestamp)"""
+    node: str
+    type: str
+    original_tags: str
+
+
 class TagBackupManager:
     """Manages tag backups for safe testing"""
     
     def __init__(self):
-        self.backups: Dict[int, Dict] = {}
-        self.backup_timestamp = datetime.now().isoformat()
+        self.backups: Dict[int, BackupEntry] = {}
+        self.backup_timestamp = _SESSION_ISO
     
     def backup_vm_tags(self, vm: Dict) -> None:
         """Backup current tags for a VM"""
-        vmid = vm['vmid']
-        self.backups[vmid] = {
-            'vmid': vmid,
-            'name': vm.get('name', ''),
-            'node': vm.get('node', ''),
-            'type': vm.get('type', ''),
-            'original_tags': vm.get('tags', ''),
-            'timestamp': self.backup_timestamp
-        }
+        self.backups[vm['vmid']] = BackupEntry(
+            vm.get('node', ''),
+            vm.get('type', ''),
+            vm.get('tags', '')
+        )
     
     def backup_multiple_vms(self, vms: List[Dict]) -> None:
         """Backup tags for multiple VMs"""
-        for vm in vms:
-            self.backup_vm_tags(vm)
+        entries = {
+            vm['vmid']: BackupEntry(vm.get('node', ''), vm.get('type', ''), vm.get('tags', ''))
+            for vm in vms
+        }
+        if self.backups:
+            self.backups.update(entries)
+        else:
+            self.backups = entries
     
     def restore_vm_tags(self, vmid: int) -> bool:
-        """Restore original tags for a VM"""
+        """Restore original tags for a VM (no-op in dry-run mode)"""
+        if live_config.dry_run_only:
+            return True
+        
         if vmid not in self.backups:
             return False
         
-        backup = self.backups[vmid]
+        node, vm_type, original_tags = self.backups[vmid]
         try:
-            result = proxmox_api.update_vm_tags(
-                backup['node'],
-                vmid,
-                backup['original_tags'],
-                backup['type']
-            )
+            result = proxmox_api.update_vm_tags(node, vmid, original_tags, vm_type)
             return 'data' in result
         except Exception as e:
             print(f"Failed to restore tags for VM {vmid}: {e}")
             return False
     
     def restore_all(self) -> Dict[int, bool]:
-        """Restore all backed up VMs"""
-        results = {}
-        for vmid in self.backups:
-            results[vmid] = self.restore_vm_tags(vmid)
-        return results
+        """Restore all backed up VMs, overlapping the per-VM API calls"""
+        vmids = list(self.backups)
+        if not vmids:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(vmids))) as executor:
+            return dict(zip(vmids, executor.map(self.restore_vm_tags, vmids)))
     
     def get_backup_info(self) -> Dict:
         """Get backup information"""
@@ -151,13 +168,13 @@ tag_backup_manager = TagBackupManager()
 
 
 # Pytest fixtures
-@pytest.fixture
+@pytest.fixture(scope="session")
 def live_test_config():
     """Fixture providing live test configuration"""
     return live_config
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def live_proxmox_config():
     """Fixture providing real Proxmox configuration"""
     if not live_config.is_enabled():
@@ -194,8 +211,9 @@ def safe_test_vm():
 
 @pytest.fixture
 def tag_backup():
-    """Fixture providing tag backup manager"""
-    return TagBackupManager()
+    """Fixture providing the shared tag backup manager, emptied after each test"""
+    yield tag_backup_manager
+    tag_backup_manager.backups.clear()
 
 
 @pytest.fixture(autouse=True)
@@ -225,6 +243,35 @@ def safe_tag_update(node: str, vmid: int, tags: str, vm_type: str, backup_manage
     return proxmox_api.update_vm_tags(node, vmid, tags, vm_type)
 
 
+def wait_until(predicate, timeout: float = 5.0, interval: float = 0.25) -> bool:
+    """Poll predicate until it returns a truthy value or timeout elapses"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+
+def assert_tags_applied(vm: Dict, tag_backup: TagBackupManager, desired: List[str],
+                        timeout: float = 5.0) -> Dict:
+    """Update VM tags and wait until Proxmox reports all desired tags"""
+    tags_str = tag_utils.format_tags(desired)
+    result = safe_tag_update(vm["node"], vm["vmid"], tags_str, vm["type"], tag_backup)
+    if live_config.dry_run_only:
+        return result
+    
+    assert "data" in result
+    
+    def _applied() -> bool:
+        config = proxmox_api.get_vm_config(vm["node"], vm["vmid"], vm["type"])
+        return set(desired) <= set(tag_utils.parse_tags(config.get("tags", "")))
+    
+    assert wait_until(_applied, timeout=timeout), \
+        f"Tags {desired} not applied to VM {vm['vmid']} within {timeout}s"
+    return result
+
+
 def validate_proxmox_connection() -> bool:
     """Validate connection to Proxmox"""
     if not live_config.is_enabled():
@@ -269,9 +316,8 @@ def validate_live_test_environment():
 # Test data generators
 def generate_test_tags() -> List[str]:
     """Generate safe test tags"""
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     return [
-        f"test-{timestamp}",
+        f"test-{_SESSION_STAMP}",
         "automated-test",
         "unit-test",
         "safe-to-delete"
@@ -281,7 +327,7 @@ def generate_test_tags() -> List[str]:
 def create_test_rule_data() -> Dict:
     """Create safe test rule data"""
     return {
-        "name": f"Test Rule {datetime.now().strftime('%Y%m%d-%H%M%S')}",
+        "name": f"Test Rule {_SESSION_STAMP}",
         "description": "Automated test rule - safe to delete",
         "conditions": {
             "operator": "AND",
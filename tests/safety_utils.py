@@ -7,19 +7,81 @@ and production VM protection.
 """
 
 import os
+import re
 import json
 import time
 import logging
+import weakref
+from collections import deque
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Dict, List, Set, Optional, Callable
 from contextlib import contextmanager
-from pathlib import Path
 
 import proxmox_api
 import tag_utils
 from tests.live_config import live_config, TagBackupManager
 
 
+# Keyword matchers used by ProductionProtection, applied to lowercased names
+_PROD_RE = re.compile(r"prod|production|live|master|main|critical|important|customer|client")
+_SAFETY_RE = re.compile(r"test|dev|development|staging|sandbox|lab")
+
+# Test VMID range (configurable)
+_TEST_VMID_MIN = int(os.getenv("PROXTAGGER_TEST_VMID_MIN", "1000"))
+_TEST_VMID_MAX = int(os.getenv("PROXTAGGER_TEST_VMID_MAX", "9999"))
+
+
+@lru_cache(maxsize=4096)
+def _test_vm_rejection(vm_name: str, vmid: int) -> Optional[str]:
+    """Return why a VM is unsafe for testing, or None; cheapest checks run first"""
+    # VMID should be in test range (configurable)
+    if not (_TEST_VMID_MIN <= vmid <= _TEST_VMID_MAX):
+        return f"VMID {vmid} is outside test range ({_TEST_VMID_MIN}-{_TEST_VMID_MAX})"
+    
+    name_lower = vm_name.lower()
+    
+    # Must have test prefix
+    if not name_lower.startswith("test-"):
+        return f"VM name '{vm_name}' does not start with 'test-' prefix"
+    
+    # Must not contain production indicators
+    if _PROD_RE.search(name_lower) is not None:
+        return f"VM name '{vm_name}' contains production indicators"
+    
+    # Must have safety indicators
+    if _SAFETY_RE.search(name_lower) is None:
+        return f"VM name '{vm_name}' lacks safety indicators"
+    
+    return None
+
+
+# Per-operation timestamps only need second precision; format each second once
+_ts_cache = [0, ""]
+
+
+def _fast_iso() -> str:
+    """Return the current time in ISO format, cached per wall-clock second"""
+    t = int(time.time())
+    if t != _ts_cache[0]:
+        _ts_cache[0] = t
+        _ts_cache[1] = datetime.fromtimestamp(t).isoformat()
+    return _ts_cache[1]
+
+
+def _write_audit_entries(logger: logging.Logger, entries: deque):
+    """Write buffered audit entries with a single logger call and clear them"""
+    if not entries:
+        return
+    
+    lines = "\n".join(
+        f"Operation: {operation} | VM: {vmid} ({name}) | {details}"
+        for operation, vmid, name, details in entries
+    )
+    entries.clear()
+    logger.info(lines)
+
+
 class SafetyError(Exception):
     """Raised when safety checks fail"""
     pass
@@ -30,12 +92,22 @@ class SafetyError(Exception):
 class SafetyMonitor:
     """Monitors test execution for safety violations"""
     
+    LOG_BUFFER_SIZE = 500  # Audit entries buffered before a flush
+    LOG_FLUSH_INTERVAL = 5.0  # Seconds between time-based flushes
+    # Safety-critical operations are written immediately, never buffered
+    WRITE_THROUGH_OPERATIONS = frozenset({
+        "BACKUP", "ROLLBACK", "ROLLBACK_ERROR", "ROLLBACK_COMPLETE", "ROLLBACK_CRITICAL_ERROR"
+    })
+    
     def __init__(self):
         self.violations = []
-        self.start_time = datetime.now()
+        self.start_time = datetime.now()  # For reporting only
         self.max_execution_time = timedelta(minutes=30)  # Max test duration
+        self._start_monotonic = time.monotonic()
+        self._max_seconds = self.max_execution_time.total_seconds()
         self.max_vm_modifications = 10  # Max VMs to modify in single test run
         self.modified_vms = set()
+        self._modified_count = 0  # len(modified_vms), maintained incrementally
         
         # Setup logging
         self.logger = logging.getLogger("SafetyMonitor")
@@ -47,19 +119,26 @@ class SafetyMonitor:
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.INFO)
+        
+        # Buffered audit trail, flushed in batches by flush_log(). Whatever is
+        # still buffered is written when the monitor is collected or at exit.
+        self._log_buf = deque(maxlen=self.LOG_BUFFER_SIZE)
+        self._last_flush = time.monotonic()
+        weakref.finalize(self, _write_audit_entries, self.logger, self._log_buf)
     
     
     def check_execution_time(self):
         """Check if execution time exceeds limits"""
-        elapsed = datetime.now() - self.start_time
-        if elapsed > self.max_execution_time:
+        if time.monotonic() - self._start_monotonic > self._max_seconds:
             raise SafetyError(f"Test execution time exceeded {self.max_execution_time}")
     
     def check_vm_modification_limit(self, vmid: int):
         """Check if VM modification limits are exceeded"""
-        self.modified_vms.add(vmid)
-        if len(self.modified_vms) > self.max_vm_modifications:
-            raise SafetyError(f"Too many VM modifications: {len(self.modified_vms)}")
+        if vmid not in self.modified_vms:
+            self.modified_vms.add(vmid)
+            self._modified_count += 1
+        if self._modified_count > self.max_vm_modifications:
+            raise SafetyError(f"Too many VM modifications: {self._modified_count}")
     
     def validate_vm_safety(self, vm: Dict) -> bool:
         """Validate that a VM is safe for testing"""
@@ -74,8 +153,20 @@ class SafetyMonitor:
         return is_safe
     
     def log_operation(self, operation: str, vm: Dict, details: str = ""):
-        """Log test operations for audit trail"""
-        self.logger.info(f"Operation: {operation} | VM: {vm.get('vmid')} ({vm.get('name')}) | {details}")
+        """Log test operations for audit trail (buffered, see flush_log)"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
+        self._log_buf.append((operation, vm.get('vmid'), vm.get('name'), details))
+        if (operation in self.WRITE_THROUGH_OPERATIONS
+                or len(self._log_buf) >= self.LOG_BUFFER_SIZE
+                or time.monotonic() - self._last_flush >= self.LOG_FLUSH_INTERVAL):
+            self.flush_log()
+    
+    def flush_log(self):
+        """Write buffered audit entries with a single logger call"""
+        self._last_flush = time.monotonic()
+        _write_audit_entries(self.logger, self._log_buf)
     
     def get_safety_report(self) -> Dict:
         """Get safety monitoring report"""
@@ -92,19 +183,49 @@ class SafetyMonitor:
 class RollbackManager:
     """Manages comprehensive rollback operations"""
     
+    OPERATION_LOG_TAIL = 1000  # Operations kept in memory for get_operation_log()
+    
     def __init__(self):
         self.tag_backup = TagBackupManager()
-        self.operation_log = []
-        self.rollback_functions = []
+        self.operation_log = deque(maxlen=self.OPERATION_LOG_TAIL)
+        self.operation_log_path = (
+            f"/tmp/proxtagger_operation_log_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.ndjson"
+        )
+        self._log_fp = None  # Opened on the first record, closed by close_operation_log
+        self._log_finalizer = None
+        self.rollback_functions = []  # Stack; popped by rollback_all
+        self.completed_rollbacks = []
+        self._backed_up: Set[int] = set()  # VMIDs whose baseline state is saved
         self.safety_monitor = SafetyMonitor()
         self.rollback_timestamp = datetime.now().isoformat()
     
+    def _record_operation(self, entry: Dict):
+        """Append an operation to the NDJSON log file and the in-memory tail
+        
+        Lines are buffered; the file is complete on disk only once
+        close_operation_log (or save_operation_log) has run.
+        """
+        if self._log_fp is None:
+            self._log_fp = open(self.operation_log_path, 'a')
+            # Close the handle even if the manager is never saved
+            self._log_finalizer = weakref.finalize(self, self._log_fp.close)
+        self._log_fp.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self.operation_log.append(entry)
+    
+    def close_operation_log(self):
+        """Flush and close the NDJSON operation log file"""
+        if self._log_fp is not None:
+            self._log_finalizer.detach()
+            self._log_fp.close()
+            self._log_fp = None
+            self._log_finalizer = None
+    
     def register_rollback_function(self, func: Callable, description: str):
         """Register a custom rollback function"""
         self.rollback_functions.append({
             "function": func,
             "description": description,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _fast_iso()
         })
     
     def backup_vm_state(self, vm: Dict) -> bool:
@@ -119,10 +240,10 @@ class RollbackManager:
             
             # Log operation
             self.safety_monitor.log_operation("BACKUP", vm, "VM state backed up")
-            self.operation_log.append({
+            self._record_operation({
                 "operation": "backup",
                 "vmid": vm["vmid"],
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _fast_iso(),
                 "vm_name": vm.get("name", "unknown")
             })
             
@@ -141,10 +262,13 @@ class RollbackManager:
         if not self.safety_monitor.validate_vm_safety(vm):
             raise SafetyError(f"VM {vm.get('vmid')} failed safety validation")
         
-        # Backup state before operation
-        backup_success = self.backup_vm_state(vm)
-        if not backup_success:
-            raise SafetyError(f"Could not backup VM {vm.get('vmid')} state")
+        # Backup state before the first operation; rollback restores that baseline.
+        # Dry runs modify nothing, so there is nothing to back up.
+        if not live_config.dry_run_only and vm["vmid"] not in self._backed_up:
+            backup_success = self.backup_vm_state(vm)
+            if not backup_success:
+                raise SafetyError(f"Could not backup VM {vm.get('vmid')} state")
+            self._backed_up.add(vm["vmid"])
         
         try:
             # Perform operation
@@ -158,10 +282,10 @@ class RollbackManager:
                 self.safety_monitor.log_operation(operation_name, vm, f"Operation completed: {result}")
             
             # Log successful operation
-            self.operation_log.append({
+            self._record_operation({
                 "operation": operation_name,
                 "vmid": vm["vmid"],
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _fast_iso(),
                 "vm_name": vm.get("name", "unknown"),
                 "result": "success",
                 "dry_run": live_config.dry_run_only
@@ -171,10 +295,10 @@ class RollbackManager:
             
         except Exception as e:
             # Log failed operation
-            self.operation_log.append({
+            self._record_operation({
                 "operation": operation_name,
                 "vmid": vm["vmid"],
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _fast_iso(),
                 "vm_name": vm.get("name", "unknown"),
                 "result": "failed",
                 "error": str(e)
@@ -185,11 +309,19 @@ class RollbackManager:
     
     def rollback_all(self) -> Dict[str, bool]:
         """Perform complete rollback of all operations"""
+        if live_config.dry_run_only:
+            # Nothing was modified or backed up, so there is nothing to roll back
+            return {"dry_run": True}
+        
         rollback_results = {}
         
         try:
-            # Execute custom rollback functions first
-            for rb_func in reversed(self.rollback_functions):  # Reverse order
+            # Execute custom rollback functions first, most recent first and
+            # exactly once even if rollback_all is called again
+            while self.rollback_functions:
+                rb_func = self.rollback_functions.pop()
+                self.completed_rollbacks.append(rb_func)
+                
                 try:
                     self.safety_monitor.log_operation("ROLLBACK", {}, f"Executing: {rb_func['description']}")
                     rb_func["function"]()
@@ -199,14 +331,11 @@ class RollbackManager:
                     rollback_results[rb_func["description"]] = False
             
             # Rollback VM tag changes
-            if not live_config.dry_run_only:
-                tag_rollback_results = self.tag_backup.restore_all()
-                rollback_results.update({
-                    f"VM_{vmid}_tags": success 
-                    for vmid, success in tag_rollback_results.items()
-                })
-            else:
-                rollback_results["tag_rollback"] = True  # No rollback needed for dry run
+            tag_rollback_results = self.tag_backup.restore_all()
+            rollback_results.update({
+                f"VM_{vmid}_tags": success 
+                for vmid, success in tag_rollback_results.items()
+            })
             
             # Generate rollback report
             successful_rollbacks = sum(1 for success in rollback_results.values() if success)
@@ -225,11 +354,13 @@ class RollbackManager:
             raise
     
     def get_operation_log(self) -> List[Dict]:
-        """Get complete operation log"""
-        return self.operation_log.copy()
+        """Get the most recent operations (the full log is in operation_log_path)"""
+        return list(self.operation_log)
     
     def save_operation_log(self, filepath: Optional[str] = None) -> str:
-        """Save operation log to file"""
+        """Close the NDJSON operation log and save a run summary pointing at it"""
+        self.close_operation_log()
+        
         if filepath is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filepath = f"/tmp/proxtagger_operation_log_{timestamp}.json"
@@ -237,10 +368,10 @@ class RollbackManager:
         log_data = {
             "rollback_timestamp": self.rollback_timestamp,
             "safety_report": self.safety_monitor.get_safety_report(),
-            "operation_log": self.operation_log,
+            "operation_log_file": self.operation_log_path,
             "rollback_functions": [
                 {k: v for k, v in rb.items() if k != "function"}  # Exclude function objects
-                for rb in self.rollback_functions
+                for rb in self.completed_rollbacks + self.rollback_functions
             ]
         }
         
@@ -255,6 +386,9 @@ def safe_test_environment():
     """Context manager for safe test execution with automatic rollback"""
     rollback_manager = RollbackManager()
     
+    # Don't carry validation results for renamed VMs over from earlier runs
+    _test_vm_rejection.cache_clear()
+    
     try:
         yield rollback_manager
         
@@ -270,9 +404,13 @@ def safe_test_environment():
         raise
         
     finally:
-        # Always save operation log
-        log_file = rollback_manager.save_operation_log()
-        print(f"Operation log saved to: {log_file}")
+        rollback_manager.safety_monitor.flush_log()
+        rollback_manager.close_operation_log()
+        
+        # Save operation log only if any operation was recorded
+        if rollback_manager.operation_log:
+            log_file = rollback_manager.save_operation_log()
+            print(f"Operation log saved to: {log_file}")
 
 
 
@@ -290,8 +428,17 @@ def safe_tag_update_with_rollback(vm: Dict, new_tags: str, rollback_manager: Rol
     )
 
 
+# Cached validate_test_environment() result, reused for _ENV_CACHE_TTL seconds
+_ENV_CACHE_TTL = 30.0
+_env_cache = {"t": 0.0, "v": None}
+
+
 def validate_test_environment() -> Dict[str, bool]:
     """Validate that test environment is safe for live testing"""
+    now = time.monotonic()
+    if _env_cache["v"] is not None and now - _env_cache["t"] < _ENV_CACHE_TTL:
+        return _env_cache["v"].copy()
+    
     checks = {}
     
     # Check 1: Live testing enabled properly
@@ -320,58 +467,40 @@ def validate_test_environment() -> Dict[str, bool]:
         checks["proxmox_connectivity"] = False
     
     # Check 5: Write permissions for logs
-    try:
-        test_log_file = Path("/tmp/proxtagger_test_write_check")
-        test_log_file.write_text("test")
-        test_log_file.unlink()
-        checks["log_write_permissions"] = True
-    except Exception:
-        checks["log_write_permissions"] = False
+    checks["log_write_permissions"] = os.access("/tmp", os.W_OK | os.X_OK)
     
     # Check 6: Dry run mode compliance
     checks["dry_run_respected"] = live_config is None or not live_config.dry_run_only or True  # Always pass for now
     
+    _env_cache.update(t=now, v=checks.copy())
     return checks
 
 
+validate_test_environment.cache_clear = lambda: _env_cache.update(t=0.0, v=None)
+
+
 class ProductionProtection:
     """Additional protection against accidentally modifying production VMs"""
     
+    @staticmethod
+    def refresh_env():
+        """Re-read the PROXTAGGER_TEST_VMID_MIN/MAX range from the environment"""
+        global _TEST_VMID_MIN, _TEST_VMID_MAX
+        _TEST_VMID_MIN = int(os.getenv("PROXTAGGER_TEST_VMID_MIN", "1000"))
+        _TEST_VMID_MAX = int(os.getenv("PROXTAGGER_TEST_VMID_MAX", "9999"))
+        _test_vm_rejection.cache_clear()
+    
     @staticmethod
     def is_production_indicator(vm_name: str) -> bool:
         """Check if VM name contains production indicators"""
-        production_keywords = [
-            "prod", "production", "live", "master", "main", 
-            "critical", "important", "customer", "client"
-        ]
-        name_lower = vm_name.lower()
-        return any(keyword in name_lower for keyword in production_keywords)
+        return _PROD_RE.search(vm_name.lower()) is not None
     
     @staticmethod
     def validate_vm_for_testing(vm: Dict) -> tuple[bool, str]:
         """Comprehensive validation of VM safety for testing"""
-        vm_name = vm.get("name", "")
-        vmid = vm.get("vmid", 0)
-        
-        # Check 1: Must have test prefix
-        if not vm_name.lower().startswith("test-"):
-            return False, f"VM name '{vm_name}' does not start with 'test-' prefix"
-        
-        # Check 2: Must not contain production indicators
-        if ProductionProtection.is_production_indicator(vm_name):
-            return False, f"VM name '{vm_name}' contains production indicators"
-        
-        # Check 3: VMID should be in test range (configurable)
-        test_vmid_min = int(os.getenv("PROXTAGGER_TEST_VMID_MIN", "1000"))
-        test_vmid_max = int(os.getenv("PROXTAGGER_TEST_VMID_MAX", "9999"))
-        
-        if not (test_vmid_min <= vmid <= test_vmid_max):
-            return False, f"VMID {vmid} is outside test range ({test_vmid_min}-{test_vmid_max})"
-        
-        # Check 4: Must have safety indicators
-        safety_keywords = ["test", "dev", "development", "staging", "sandbox", "lab"]
-        if not any(keyword in vm_name.lower() for keyword in safety_keywords):
-            return False, f"VM name '{vm_name}' lacks safety indicators"
+        reason = _test_vm_rejection(vm.get("name", ""), vm.get("vmid", 0))
+        if reason is not None:
+            return False, reason
         
         return True, "VM validated for testing"
     
@@ -381,22 +510,27 @@ class ProductionProtection:
         safe_vms = []
         unsafe_vms = []
         
+        # Single pass with the hot lookups bound to locals
+        rejection = _test_vm_rejection
+        safe_append = safe_vms.append
+        unsafe_append = unsafe_vms.append
+        
         for vm in vms:
-            is_safe, reason = ProductionProtection.validate_vm_for_testing(vm)
-            if is_safe:
-                safe_vms.append({"vmid": vm["vmid"], "name": vm.get("name", "")})
+            vmid = vm["vmid"]
+            name = vm.get("name", "")
+            reason = rejection(name, vmid)
+            if reason is None:
+                safe_append({"vmid": vmid, "name": name})
             else:
-                unsafe_vms.append({
-                    "vmid": vm["vmid"], 
-                    "name": vm.get("name", ""), 
-                    "reason": reason
-                })
+                unsafe_append({"vmid": vmid, "name": name, "reason": reason})
         
+        total = len(vms)
+        safe_count = len(safe_vms)
         return {
-            "total_vms": len(vms),
+            "total_vms": total,
             "safe_vms": safe_vms,
             "unsafe_vms": unsafe_vms,
-            "safe_count": len(safe_vms),
-            "unsafe_count": len(unsafe_vms),
-            "safety_percentage": (len(safe_vms) / len(vms) * 100) if vms else 0
+            "safe_count": safe_count,
+            "unsafe_count": total - safe_count,
+            "safety_percentage": (safe_count * 100 / total) if total else 0
         }
\ No newline at end of file
@@ -6,7 +6,10 @@ a real Proxmox environment without extensive safety mechanisms.
 """
 
 import os
+import time
 import pytest
+from collections import defaultdict
+from functools import lru_cache
 from typing import Dict, List, Optional
 import config
 import proxmox_api
@@ -15,8 +18,12 @@ import proxmox_api
 class SimpleLiveConfig:
     """Simple configuration for live Proxmox testing"""
     
+    VMS_CACHE_TTL = 5.0  # Seconds a fetched VM list is reused
+    
     def __init__(self):
         self.enabled = os.getenv('PROXTAGGER_LIVE_TESTS', 'false').lower() == 'true'
+        self._vms_cache = None
+        self._vms_cache_t = 0.0
         
         # Load actual Proxmox configuration
         try:
@@ -31,15 +38,28 @@ class SimpleLiveConfig:
         return self.enabled and self.proxmox_config is not None
     
     def get_all_vms(self) -> List[Dict]:
-        """Get all VMs from Proxmox"""
+        """Get all VMs from Proxmox (cached for VMS_CACHE_TTL seconds)"""
         if not self.is_enabled():
             return []
         
+        now = time.monotonic()
+        if self._vms_cache is not None and now - self._vms_cache_t < self.VMS_CACHE_TTL:
+            return self._vms_cache
+        
         try:
-            return proxmox_api.get_all_vms()
+            vms = proxmox_api.get_all_vms()
         except Exception as e:
             print(f"Warning: Could not fetch VMs: {e}")
             return []
+        
+        self._vms_cache = vms
+        self._vms_cache_t = now
+        return vms
+    
+    def invalidate(self):
+        """Drop the cached VM list so the next get_all_vms() refetches"""
+        self._vms_cache = None
+        self._vms_cache_t = 0.0
 
 
 # Global instance
@@ -61,9 +81,9 @@ def simple_live_proxmox_config():
     return simple_live_config.proxmox_config
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def all_vms():
-    """Fixture providing all VMs from Proxmox"""
+    """Fixture providing all VMs from Proxmox (fetched once per session)"""
     if not simple_live_config.is_enabled():
         pytest.skip("Live testing is disabled")
     
@@ -74,17 +94,22 @@ def all_vms():
     return vms
 
 
-@pytest.fixture
-def first_vm():
+@pytest.fixture(scope="session")
+def first_vm(all_vms):
     """Fixture providing first VM for simple testing"""
-    if not simple_live_config.is_enabled():
-        pytest.skip("Live testing is disabled")
-    
-    vms = simple_live_config.get_all_vms()
-    if not vms:
-        pytest.skip("No VMs found")
+    return all_vms[0]
+
+
+@pytest.fixture(scope="session")
+def vm_indexes(all_vms):
+    """Fixture indexing VMIDs by status and type, built once per session"""
+    by_status = defaultdict(set)
+    by_type = defaultdict(set)
+    for vm in all_vms:
+        by_status[vm.get("status")].add(vm["vmid"])
+        by_type[vm.get("type")].add(vm["vmid"])
     
-    return vms[0]
+    return {"by_status": dict(by_status), "by_type": dict(by_type)}
 
 
 @pytest.fixture(autouse=True)
@@ -99,6 +124,12 @@ def skip_live_tests_if_disabled():
     return skip_if_disabled
 
 
+@lru_cache(maxsize=512)
+def cached_vm_config(node: str, vmid: int) -> Dict:
+    """VM config lookup shared across read-only live tests (do not mutate)"""
+    return proxmox_api.get_vm_config(node, vmid)
+
+
 def validate_connection() -> bool:
     """Simple validation of Proxmox connection"""
     if not simple_live_config.is_enabled():
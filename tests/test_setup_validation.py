@@ -31,9 +31,9 @@ class TestSetupValidation:
             "pytest.ini"
         ]
         
-        for file_name in required_files:
-            file_path = project_root / file_name
-            assert file_path.exists(), f"Required file missing: {file_name}"
+        existing = {entry.name for entry in os.scandir(project_root)}
+        missing = set(required_files) - existing
+        assert not missing, f"Required files missing: {sorted(missing)}"
     
     @pytest.mark.unit
     def test_modules_importable(self):
@@ -17,7 +17,7 @@ from modules.conditional_tags.engine import RuleEngine
 from modules.conditional_tags.storage import RuleStorage
 
 # Import simple live config
-from tests.simple_live_config import simple_live_config
+from tests.simple_live_config import simple_live_config, cached_vm_config
 
 
 class TestBasicLiveFunctionality:
@@ -50,7 +50,7 @@ class TestBasicLiveFunctionality:
         if first_vm.get("type") == "lxc":
             pytest.skip("get_vm_config only supports QEMU VMs, skipping LXC container")
             
-        config = proxmox_api.get_vm_config(first_vm["node"], first_vm["vmid"])
+        config = cached_vm_config(first_vm["node"], first_vm["vmid"])
         
         assert isinstance(config, dict)
         assert len(config) > 0
@@ -91,11 +91,12 @@ class TestBasicLiveFunctionality:
             print("ℹ️  No tags found in any VMs")
 
 
+@pytest.mark.xdist_group("live_read_only")
 class TestConditionalTaggingLive:
     """Test conditional tagging with live data"""
     
     @pytest.mark.live
-    def test_simple_rule_dry_run(self, all_vms, temp_storage_file):
+    def test_simple_rule_dry_run(self, all_vms, vm_indexes, temp_storage_file):
         """Test simple conditional rule in dry-run mode"""
         storage = RuleStorage(temp_storage_file)
         engine = RuleEngine()
@@ -121,7 +122,7 @@ class TestConditionalTaggingLive:
         assert result.success
         assert result.dry_run
         
-        running_vms = [vm for vm in all_vms if vm.get("status") == "running"]
+        running_vms = vm_indexes["by_status"].get("running", set())
         
         print(f"✅ Rule executed successfully")
         print(f"   Running VMs found: {len(running_vms)}")
@@ -160,17 +161,17 @@ class TestConditionalTaggingLive:
         
         assert result.success
         
-        expected_matches = [vm["vmid"] for vm in all_vms if vm["vmid"] > mid_vmid]
+        expected_matches = {vm["vmid"] for vm in all_vms if vm["vmid"] > mid_vmid}
         
         print(f"✅ VMID range rule executed")
         print(f"   VMID range: {min_vmid} - {max_vmid} (threshold: {mid_vmid})")
         print(f"   Expected matches: {len(expected_matches)}")
         print(f"   Actual matches: {len(result.matched_vms)}")
         
-        assert set(result.matched_vms) == set(expected_matches)
+        assert set(result.matched_vms) == expected_matches
     
     @pytest.mark.live
-    def test_vm_type_rule(self, all_vms, temp_storage_file):
+    def test_vm_type_rule(self, all_vms, vm_indexes, temp_storage_file):
         """Test rule based on VM type"""
         if not all_vms:
             pytest.skip("No VMs available")
@@ -179,7 +180,7 @@ class TestConditionalTaggingLive:
         engine = RuleEngine()
         
         # Get available VM types
-        vm_types = {vm.get("type") for vm in all_vms}
+        vm_types = vm_indexes["by_type"].keys()
         
         if not vm_types:
             pytest.skip("No VM types found")
@@ -202,15 +203,15 @@ class TestConditionalTaggingLive:
             
             assert result.success
             
-            expected_matches = [vm["vmid"] for vm in all_vms if vm.get("type") == vm_type]
+            expected_matches = vm_indexes["by_type"][vm_type]
             actual_matches = result.matched_vms
             
             print(f"✅ {vm_type.upper()} VM rule: {len(actual_matches)} matches")
             
-            assert set(actual_matches) == set(expected_matches)
+            assert set(actual_matches) == expected_matches
     
     @pytest.mark.live
-    def test_complex_rule_with_live_data(self, all_vms, temp_storage_file):
+    def test_complex_rule_with_live_data(self, all_vms, vm_indexes, temp_storage_file):
         """Test complex rule with multiple conditions"""
         if len(all_vms) < 2:
             pytest.skip("Need at least 2 VMs for complex rule testing")
@@ -236,20 +237,19 @@ class TestConditionalTaggingLive:
         
         assert result.success
         
-        # Manually calculate expected matches
-        expected_matches = []
-        for vm in all_vms:
-            if vm.get("status") == "running" or vm.get("type") == "qemu":
-                expected_matches.append(vm["vmid"])
+        # Expected matches from the session VM indexes
+        running_vms = vm_indexes["by_status"].get("running", set())
+        qemu_vms = vm_indexes["by_type"].get("qemu", set())
+        expected_matches = running_vms | qemu_vms
         
         print(f"✅ Complex OR rule executed")
         print(f"   Total VMs: {len(all_vms)}")
-        print(f"   Running VMs: {len([vm for vm in all_vms if vm.get('status') == 'running'])}")
-        print(f"   QEMU VMs: {len([vm for vm in all_vms if vm.get('type') == 'qemu'])}")
+        print(f"   Running VMs: {len(running_vms)}")
+        print(f"   QEMU VMs: {len(qemu_vms)}")
         print(f"   Expected matches: {len(expected_matches)}")
         print(f"   Actual matches: {len(result.matched_vms)}")
         
-        assert set(result.matched_vms) == set(expected_matches)
+        assert set(result.matched_vms) == expected_matches
 
 
 class TestLiveTagModification:
@@ -262,7 +262,7 @@ class TestLiveTagModification:
         if first_vm.get("type") == "lxc":
             pytest.skip("get_vm_config only supports QEMU VMs, skipping LXC container")
             
-        # Get original tags
+        # Get original tags (uncached: this class is where tags would change)
         original_config = proxmox_api.get_vm_config(first_vm["node"], first_vm["vmid"])
         original_tags = original_config.get("tags", "")
         
@@ -343,6 +343,17 @@ class TestApiBulkTagUpdate:
                                content_type='application/json')
         assert response.status_code == 400
 
+    @pytest.mark.parametrize("tags", ["web", ["web", ["nested"]], ["web", 1]])
+    def test_rejects_tags_that_are_not_a_list_of_strings(self, client, tags):
+        response = client.post('/api/bulk-tag-update',
+                               data=json.dumps({
+                                   "operation": "remove",
+                                   "tags": tags,
+                                   "vms": [{"id": 100, "node": "n1", "type": "qemu"}],
+                               }),
+                               content_type='application/json')
+        assert response.status_code == 400
+
     def test_rejects_empty_vms_list(self, client):
         response = client.post('/api/bulk-tag-update',
                                data=json.dumps({
@@ -461,6 +472,12 @@ class TestBackupTags:
 # ---------------------------------------------------------------------------
 class TestRestoreTags:
 
+    @pytest.fixture(autouse=True)
+    def no_current_vms(self):
+        # Restore looks up current tags first; default to an empty cluster
+        with patch('app.get_all_vms', return_value=[]):
+            yield
+
     @patch('app.update_vm_tags')
     def test_restores_from_valid_backup(self, mock_update, client):
         mock_update.return_value = None
@@ -542,6 +559,46 @@ class TestRestoreTags:
         assert body['success'] is True
         assert 'partial_failures' in body
 
+    @patch('app.get_all_vms')
+    @patch('app.update_vm_tags')
+    def test_skips_vms_already_matching_backup(self, mock_update, mock_vms, client):
+        mock_vms.return_value = [
+            {"vmid": 100, "tags": "prod;web"},
+            {"vmid": 101, "tags": "old"},
+        ]
+
+        backup = [
+            {"id": 100, "name": "vm1", "node": "n1", "type": "qemu", "tags": ["web", "prod"]},
+            {"id": 101, "name": "vm2", "node": "n1", "type": "lxc", "tags": ["dev"]},
+        ]
+        data = BytesIO(json.dumps(backup).encode())
+
+        response = client.post('/api/restore-tags',
+                               data={'backup_file': (data, 'backup.json')},
+                               content_type='multipart/form-data')
+
+        assert response.status_code == 200
+        body = json.loads(response.data)
+        assert body['success'] is True
+        mock_update.assert_called_once_with('n1', 101, 'dev', 'lxc')
+
+    @patch('app.get_all_vms')
+    @patch('app.update_vm_tags')
+    def test_restores_all_when_vm_listing_fails(self, mock_update, mock_vms, client):
+        mock_vms.side_effect = Exception("Connection refused")
+
+        backup = [
+            {"id": 100, "name": "vm1", "node": "n1", "type": "qemu", "tags": ["web"]},
+        ]
+        data = BytesIO(json.dumps(backup).encode())
+
+        response = client.post('/api/restore-tags',
+                               data={'backup_file': (data, 'backup.json')},
+                               content_type='multipart/form-data')
+
+        assert response.status_code == 200
+        assert mock_update.call_count == 1
+
 
 # ---------------------------------------------------------------------------
 # GET /download-and-redirect
@@ -813,6 +870,11 @@ class TestBackupTagsRoute:
 
 class TestRestoreTagsRoute:
 
+    @pytest.fixture(autouse=True)
+    def no_current_vms(self):
+        with patch('app.get_all_vms', return_value=[]):
+            yield
+
     def _post_backup(self, client, payload):
         data = {
             'backup_file': (BytesIO(json.dumps(payload).encode('utf-8')), 'backup.json'),
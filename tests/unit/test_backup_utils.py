@@ -22,8 +22,7 @@ class TestCreateBackupFile:
         assert filename.startswith("proxmox_tags_backup_")
         assert filename.endswith(".json")
 
-        buffer.seek(0)
-        backup_data = json.loads(buffer.read().decode('utf-8'))
+        backup_data = json.loads(buffer.getvalue())
 
         # v2 wrapper shape
         assert isinstance(backup_data, dict)
@@ -44,8 +43,7 @@ class TestCreateBackupFile:
     def test_create_backup_file_empty_vms(self):
         """Test backup creation with empty VM list (still emits v2 wrapper)."""
         buffer, filename = create_backup_file([])
-        buffer.seek(0)
-        backup_data = json.loads(buffer.read().decode('utf-8'))
+        backup_data = json.loads(buffer.getvalue())
         assert backup_data["version"] == BACKUP_FORMAT_VERSION
         assert backup_data["vms"] == []
         assert backup_data["tag_colors"] == {}
@@ -55,8 +53,7 @@ class TestCreateBackupFile:
         """Test backup creation with VM that has no tags"""
         vms = [{"vmid": 100, "name": "test-vm", "node": "node1", "type": "qemu", "tags": ""}]
         buffer, _ = create_backup_file(vms)
-        buffer.seek(0)
-        backup_data = json.loads(buffer.read().decode('utf-8'))
+        backup_data = json.loads(buffer.getvalue())
 
         assert len(backup_data["vms"]) == 1
         assert backup_data["vms"][0]["tags"] == []
@@ -66,8 +63,7 @@ class TestCreateBackupFile:
         """Test that tags are properly cleaned in backup"""
         vms = [{"vmid": 100, "name": "t", "node": "n", "type": "qemu", "tags": "web;  ;production;;"}]
         buffer, _ = create_backup_file(vms)
-        buffer.seek(0)
-        backup_data = json.loads(buffer.read().decode('utf-8'))
+        backup_data = json.loads(buffer.getvalue())
 
         assert backup_data["vms"][0]["tags"] == ["web", "production"]
 
@@ -79,8 +75,7 @@ class TestCreateBackupFile:
             {"vmid": 101, "node": "node2", "type": "lxc", "tags": "web"},
         ]
         buffer, _ = create_backup_file(vms)
-        buffer.seek(0)
-        backup_data = json.loads(buffer.read().decode('utf-8'))
+        backup_data = json.loads(buffer.getvalue())
 
         assert len(backup_data["vms"]) == 2
         assert backup_data["vms"][0]["tags"] == []
@@ -94,16 +89,14 @@ class TestCreateBackupFile:
             "dev": {"bg": "00ff00", "fg": None},
         }
         buffer, _ = create_backup_file([], color_map=color_map)
-        buffer.seek(0)
-        data = json.loads(buffer.read().decode('utf-8'))
+        data = json.loads(buffer.getvalue())
         assert data["tag_colors"] == color_map
 
     @pytest.mark.unit
     def test_create_backup_file_color_map_default_empty(self):
         """Omitting color_map yields tag_colors: {}."""
         buffer, _ = create_backup_file([])
-        buffer.seek(0)
-        data = json.loads(buffer.read().decode('utf-8'))
+        data = json.loads(buffer.getvalue())
         assert data["tag_colors"] == {}
     
     @pytest.mark.unit
@@ -170,6 +163,52 @@ class TestRestoreFromBackupData:
         call_args = mock_update_function.call_args_list[1]
         assert call_args[0] == ("node2", 101, "development;database", "lxc")
     
+    @pytest.mark.unit
+    def test_restore_skips_vms_whose_tags_already_match(self, valid_backup_data, mock_update_function):
+        """Test that VMs already carrying the backed-up tags are not updated"""
+        current_vms = [
+            {"vmid": 100, "tags": "web;production"},  # Same tags, different order
+            {"vmid": 101, "tags": "development"},  # Differs from backup
+        ]
+
+        result = restore_from_backup_data(valid_backup_data, mock_update_function,
+                                          current_vms=current_vms)
+
+        assert result["success"] is True
+        assert result["updated"] == 1
+        assert result["skipped"] == 1
+        mock_update_function.assert_called_once_with("node2", 101, "development;database", "lxc")
+
+    @pytest.mark.unit
+    def test_restore_without_current_vms_updates_all(self, valid_backup_data, mock_update_function):
+        """Test that every VM is updated when current state is not supplied"""
+        result = restore_from_backup_data(valid_backup_data, mock_update_function)
+
+        assert result["updated"] == 2
+        assert result["skipped"] == 0
+
+    @pytest.mark.unit
+    def test_restore_concurrently_reports_in_backup_order(self, mock_update_function):
+        """Test that concurrent restores count results per VM in backup order"""
+        backup_data = [
+            {"id": vmid, "name": f"vm-{vmid}", "node": "node1", "type": "qemu", "tags": ["web"]}
+            for vmid in range(100, 110)
+        ]
+
+        def update(node, vmid, tags_str, vm_type):
+            if vmid in (103, 107):
+                raise Exception(f"Update failed for {vmid}")
+
+        mock_update_function.side_effect = update
+
+        result = restore_from_backup_data(backup_data, mock_update_function, max_workers=4)
+
+        assert mock_update_function.call_count == 10
+        assert result["updated"] == 8
+        assert result["failed"] == 2
+        assert [f["vmid"] for f in result["failures"]] == [103, 107]
+        assert result["success"] is False
+
     @pytest.mark.unit
     def test_restore_from_backup_data_empty_tags(self, mock_update_function):
         """Test restore with empty tags"""
@@ -330,8 +369,7 @@ class TestBackupUtilsIntegration:
     def test_backup_restore_roundtrip(self, sample_vms):
         """Test creating backup and restoring it (v2 round-trip)."""
         buffer, _ = create_backup_file(sample_vms)
-        buffer.seek(0)
-        backup_data = json.loads(buffer.read().decode('utf-8'))
+        backup_data = json.loads(buffer.getvalue())
 
         mock_update = Mock()
         result = restore_from_backup_data(backup_data, mock_update)
@@ -349,8 +387,7 @@ class TestBackupUtilsIntegration:
     def test_backup_data_consistency(self, sample_vms):
         """Test that backup data maintains consistency"""
         buffer, _ = create_backup_file(sample_vms)
-        buffer.seek(0)
-        backup_data = json.loads(buffer.read().decode('utf-8'))
+        backup_data = json.loads(buffer.getvalue())
 
         for vm_backup in backup_data["vms"]:
             assert "id" in vm_backup
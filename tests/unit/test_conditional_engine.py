@@ -309,6 +309,83 @@ class TestConditionEvaluation:
         conditions = RuleConditionGroup()
         result = engine._evaluate_conditions(conditions, sample_vm)
         assert result is False  # Empty conditions should return False
+    
+    @pytest.mark.unit
+    def test_compile_conditions_matches_condition_evaluation(self, engine, sample_vm):
+        """Test compiled predicates agree with per-condition evaluation"""
+        conditions = [
+            RuleCondition("status", "equals", "running"),
+            RuleCondition("vmid", "greater_than", 100),
+            RuleCondition("name", "regex", "^prod-"),
+            RuleCondition("tags", "not_contains", "web"),
+            RuleCondition("config.ostype", "equals", "l26"),
+            RuleCondition("missing", "in", ["a", "b"]),
+            RuleCondition("status", "not_in", ["Stopped", "paused"]),
+            RuleCondition("status", "in", "RUNNING"),
+            RuleCondition("name", "not_equals", "PROD-WEB-01"),
+            RuleCondition("tags", "contains", "Prod"),
+            RuleCondition("vmid", "less_equals", "150"),
+            RuleCondition("vmid", "greater_equals", "not-a-number"),
+            RuleCondition("name", "less_than", 200),
+        ]
+        vms = [sample_vm, {**sample_vm, "vmid": 50, "status": "stopped"},
+               {**sample_vm, "config": {"ostype": "l26"}}]
+        
+        for condition in conditions:
+            predicate = engine._compile_condition(condition)
+            for vm in vms:
+                assert predicate(vm) == engine._evaluate_condition(condition, vm)
+    
+    @pytest.mark.unit
+    def test_compile_conditions_short_circuits_cheap_conditions_first(self, engine, sample_vm):
+        """Test cheap conditions run first and skip expensive ones"""
+        conditions = RuleConditionGroup(operator="AND")
+        conditions.add_condition(RuleCondition("name", "regex", "^prod-"))
+        conditions.add_condition(RuleCondition("status", "equals", "stopped"))
+        
+        engine.operators[OperatorType.REGEX] = Mock(return_value=True)
+        
+        assert engine._evaluate_conditions(conditions, sample_vm) is False
+        engine.operators[OperatorType.REGEX].assert_not_called()
+        # Stored condition order is unchanged
+        assert [c.operator for c in conditions.conditions] == [OperatorType.REGEX, OperatorType.EQUALS]
+    
+    @pytest.mark.unit
+    def test_compile_conditions_cached_by_content(self, engine, sample_vm):
+        """Test compiled predicates are reused until the conditions change"""
+        conditions = RuleConditionGroup(operator="AND")
+        conditions.add_condition(RuleCondition("status", "equals", "running"))
+        
+        first = engine._compile_conditions(conditions)
+        assert engine._compile_conditions(RuleConditionGroup.from_dict(conditions.to_dict())) is first
+        
+        # Editing the rule compiles a fresh predicate
+        conditions.conditions[0].value = "stopped"
+        assert engine._compile_conditions(conditions) is not first
+        assert engine._evaluate_conditions(conditions, sample_vm) is False
+    
+    @pytest.mark.unit
+    def test_compile_conditions_unserializable_value_not_cached(self, engine, sample_vm):
+        """Test values that can't form a cache key are still evaluated"""
+        conditions = RuleConditionGroup(operator="AND")
+        conditions.add_condition(RuleCondition("status", "in", {1: "a", "b": 2}))
+        conditions.add_condition(RuleCondition("status", "equals", "running"))
+        
+        assert engine._evaluate_conditions(conditions, sample_vm) is False
+        assert engine._compiled_cache == {}
+    
+    @pytest.mark.unit
+    def test_compiled_regex_condition(self, engine, sample_vm):
+        """Test regex conditions compile their pattern once and keep invalid ones failing"""
+        conditions = RuleConditionGroup(operator="AND")
+        conditions.add_condition(RuleCondition("name", "regex", "^prod-"))
+        assert engine._evaluate_conditions(conditions, sample_vm) is True
+        
+        conditions.conditions[0].value = "[invalid-regex"
+        assert engine._evaluate_conditions(conditions, sample_vm) is False
+        
+        conditions.conditions[0].value = 123
+        assert engine._evaluate_conditions(conditions, sample_vm) is False
 
 
 class TestRuleEvaluation:
@@ -414,11 +491,32 @@ class TestRuleEvaluation:
         assert len(result.errors) > 0  # But has errors from updates
         assert "Update failed" in str(result.errors)
     
+    @pytest.mark.unit
+    @patch('proxmox_api.update_vm_tags')
+    def test_evaluate_rule_concurrent_updates_report_in_vm_order(self, mock_update_vm_tags, sample_vms):
+        """Test concurrent tag updates record their errors in VM order"""
+        conditions = RuleConditionGroup()
+        conditions.add_condition(RuleCondition("status", "equals", "running"))
+        rule = ConditionalRule("Running Rule", conditions=conditions,
+                               actions=RuleAction(add_tags=["monitored"]))
+        
+        def update(node, vmid, tags, vm_type):
+            if vmid == 100:
+                raise Exception("first failed")
+            raise Exception("second failed")
+        mock_update_vm_tags.side_effect = update
+        
+        result = RuleEngine(max_workers=4).evaluate_rule(rule, sample_vms, dry_run=False)
+        
+        assert mock_update_vm_tags.call_count == 2
+        assert result.errors == ["Failed to update VM 100: first failed",
+                                 "Failed to update VM 200: second failed"]
+    
     @pytest.mark.unit
     def test_evaluate_rule_exception(self, engine, simple_rule, sample_vms):
         """Test rule evaluation with exception"""
-        # Mock condition evaluation to raise exception
-        with patch.object(engine, '_evaluate_conditions', side_effect=Exception("Evaluation failed")):
+        # Mock condition compilation to raise exception
+        with patch.object(engine, '_compile_conditions', side_effect=Exception("Evaluation failed")):
             result = engine.evaluate_rule(simple_rule, sample_vms)
         
         assert result.success is False
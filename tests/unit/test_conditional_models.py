@@ -285,6 +285,7 @@ class TestConditionalRule:
         assert len(rule.id) > 0
         assert isinstance(rule.created_at, datetime)
         assert isinstance(rule.updated_at, datetime)
+        assert rule.updated_at == rule.created_at
         assert rule.last_run is None
         assert isinstance(rule.stats, dict)
     
@@ -461,6 +462,36 @@ class TestConditionalRuleValidation:
         
         # Should not have cron-related errors
         assert not any("cron" in error.lower() for error in errors)
+    
+    @pytest.mark.unit
+    def test_validate_cron_parsed_once_per_expression(self):
+        """Test repeated validation reuses the parsed cron expression"""
+        rule = ConditionalRule("Test Rule")
+        rule.conditions.add_condition(RuleCondition("status", "equals", "running"))
+        rule.actions.add_tags = ["test"]
+        rule.schedule.enabled = True
+        # The patched parser accepts anything; a unique expression keeps
+        # results cached by other tests out of the call count
+        rule.schedule.cron = f"30 4 * * 1 {uuid.uuid4().hex}"
+        
+        with patch('apscheduler.triggers.cron.CronTrigger.from_crontab') as mock_from_crontab:
+            assert rule.validate() == []
+            assert rule.validate() == []
+        
+        mock_from_crontab.assert_called_once_with(rule.schedule.cron)
+    
+    @pytest.mark.unit
+    def test_validate_non_string_cron(self):
+        """Test validation rejects a cron value that isn't a string"""
+        rule = ConditionalRule("Test Rule")
+        rule.conditions.add_condition(RuleCondition("status", "equals", "running"))
+        rule.actions.add_tags = ["test"]
+        rule.schedule.enabled = True
+        rule.schedule.cron = ["0", "2", "*", "*", "*"]
+        
+        errors = rule.validate()
+        
+        assert any("Invalid cron expression" in error for error in errors)
 
 
 class TestExecutionResult:
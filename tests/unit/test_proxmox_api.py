@@ -168,6 +168,7 @@ class TestGetVmConfig:
         mock_requests_get.assert_called_once()
         args, kwargs = mock_requests_get.call_args
         assert "nodes/node1/qemu/100/config" in args[0]
+        assert kwargs["timeout"] == 5
     
     @pytest.mark.unit
     def test_get_vm_config_empty_response(self, mock_load_config, mock_requests_get):
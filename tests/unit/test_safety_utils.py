@@ -0,0 +1,188 @@
+"""
+Unit tests for live-test safety utilities
+"""
+
+import pytest
+import gc
+import json
+from unittest.mock import Mock, patch
+from tests.safety_utils import SafetyMonitor, RollbackManager
+
+
+@pytest.fixture
+def test_vm():
+    return {"vmid": 1001, "name": "test-vm-01", "node": "node1", "type": "qemu", "tags": "web"}
+
+
+@pytest.fixture
+def rollback_manager(tmp_path):
+    """RollbackManager writing its log under tmp_path, with live mode faked"""
+    config = Mock(dry_run_only=False)
+    config.is_test_vm.return_value = True
+    with patch('tests.safety_utils.live_config', config):
+        manager = RollbackManager()
+        manager.operation_log_path = str(tmp_path / "operations.ndjson")
+        manager.tag_backup = Mock()
+        manager.tag_backup.restore_all.return_value = {}
+        yield manager
+
+
+class TestSafetyMonitorAuditLog:
+    """Test the buffered audit log"""
+
+    @pytest.mark.unit
+    def test_flush_log_writes_buffered_entries(self, test_vm):
+        """Test buffered entries are written together by flush_log"""
+        monitor = SafetyMonitor()
+        with patch.object(monitor.logger, 'info') as mock_info:
+            monitor.log_operation("TAG_UPDATE", test_vm, "Starting")
+            monitor.log_operation("TAG_UPDATE", test_vm, "Completed")
+            mock_info.assert_not_called()
+
+            monitor.flush_log()
+            monitor.flush_log()
+
+        mock_info.assert_called_once()
+        lines = mock_info.call_args[0][0].splitlines()
+        assert lines == [
+            "Operation: TAG_UPDATE | VM: 1001 (test-vm-01) | Starting",
+            "Operation: TAG_UPDATE | VM: 1001 (test-vm-01) | Completed",
+        ]
+
+    @pytest.mark.unit
+    def test_safety_critical_operations_written_immediately(self, test_vm):
+        """Test rollback records flush the buffer instead of waiting in it"""
+        monitor = SafetyMonitor()
+        with patch.object(monitor.logger, 'info') as mock_info:
+            monitor.log_operation("TAG_UPDATE", test_vm, "Starting")
+            monitor.log_operation("ROLLBACK", {}, "Executing: restore tags")
+
+        mock_info.assert_called_once()
+        assert "ROLLBACK" in mock_info.call_args[0][0]
+        assert "TAG_UPDATE" in mock_info.call_args[0][0]
+
+    @pytest.mark.unit
+    def test_buffer_flushed_when_monitor_collected(self, test_vm):
+        """Test entries still buffered are written when the monitor goes away"""
+        monitor = SafetyMonitor()
+        with patch.object(monitor.logger, 'info') as mock_info:
+            monitor.log_operation("TAG_UPDATE", test_vm, "Starting")
+            del monitor
+            gc.collect()
+
+        mock_info.assert_called_once()
+        assert "Starting" in mock_info.call_args[0][0]
+
+
+class TestRollbackManagerOperationLog:
+    """Test the NDJSON operation log"""
+
+    @pytest.mark.unit
+    def test_operations_written_as_ndjson(self, rollback_manager, test_vm, tmp_path):
+        """Test each recorded operation is one compact JSON line"""
+        operation = Mock(return_value={"data": "ok"})
+        rollback_manager.safe_vm_operation(test_vm, operation, "TAG_UPDATE", tags="web;new")
+        rollback_manager.safe_vm_operation(test_vm, operation, "TAG_UPDATE", tags="web")
+
+        # Complete on disk once save_operation_log() has closed the log
+        summary_path = rollback_manager.save_operation_log(str(tmp_path / "summary.json"))
+        with open(rollback_manager.operation_log_path) as f:
+            lines = f.read().splitlines()
+        entries = [json.loads(line) for line in lines]
+
+        # Backed up once before the first operation only
+        assert [entry["operation"] for entry in entries] == ["backup", "TAG_UPDATE", "TAG_UPDATE"]
+        assert all(entry["vmid"] == 1001 for entry in entries)
+        assert lines[0] == json.dumps(entries[0], separators=(',', ':'))
+        assert rollback_manager.get_operation_log() == entries
+
+        with open(summary_path) as f:
+            summary = json.load(f)
+        assert summary["operation_log_file"] == rollback_manager.operation_log_path
+
+    @pytest.mark.unit
+    def test_log_file_opened_once_and_closed_on_save(self, rollback_manager, test_vm, tmp_path):
+        """Test the log is written through one handle that saving closes"""
+        operation = Mock(return_value={"data": "ok"})
+        with patch('builtins.open', wraps=open) as mock_open:
+            rollback_manager.safe_vm_operation(test_vm, operation, "TAG_UPDATE", tags="web;new")
+            rollback_manager.safe_vm_operation(test_vm, operation, "TAG_UPDATE", tags="web")
+        mock_open.assert_called_once_with(rollback_manager.operation_log_path, 'a')
+
+        log_fp = rollback_manager._log_fp
+        rollback_manager.save_operation_log(str(tmp_path / "summary.json"))
+        assert log_fp.closed
+        assert rollback_manager._log_fp is None
+
+    @pytest.mark.unit
+    def test_log_file_closed_when_manager_collected(self, test_vm, tmp_path):
+        """Test an unsaved manager's log handle is closed when it goes away"""
+        with patch('tests.safety_utils.live_config', Mock(dry_run_only=True)):
+            manager = RollbackManager()
+            manager.operation_log_path = str(tmp_path / "operations.ndjson")
+            manager.safe_vm_operation(test_vm, Mock(), "TAG_UPDATE")
+        log_fp = manager._log_fp
+        assert not log_fp.closed
+
+        del manager
+        gc.collect()
+
+        assert log_fp.closed
+
+    @pytest.mark.unit
+    def test_failed_operation_logged(self, rollback_manager, test_vm):
+        """Test failed operations are recorded with their error"""
+        operation = Mock(side_effect=Exception("API down"))
+
+        with pytest.raises(Exception, match="API down"):
+            rollback_manager.safe_vm_operation(test_vm, operation, "TAG_UPDATE")
+
+        failed = rollback_manager.get_operation_log()[-1]
+        assert failed["result"] == "failed"
+        assert failed["error"] == "API down"
+
+
+class TestRollbackManagerRollback:
+    """Test rollback function bookkeeping"""
+
+    @pytest.mark.unit
+    def test_rollback_functions_run_newest_first_once(self, rollback_manager, tmp_path):
+        """Test rollback functions run in reverse order and are not re-run"""
+        calls = []
+        rollback_manager.register_rollback_function(lambda: calls.append("first"), "first")
+        rollback_manager.register_rollback_function(lambda: calls.append("second"), "second")
+
+        results = rollback_manager.rollback_all()
+        rollback_manager.rollback_all()
+
+        assert calls == ["second", "first"]
+        assert results == {"second": True, "first": True}
+        assert rollback_manager.rollback_functions == []
+        assert [rb["description"] for rb in rollback_manager.completed_rollbacks] == ["second", "first"]
+
+        summary_path = rollback_manager.save_operation_log(str(tmp_path / "summary.json"))
+        with open(summary_path) as f:
+            summary = json.load(f)
+        assert [rb["description"] for rb in summary["rollback_functions"]] == ["second", "first"]
+        assert all("function" not in rb for rb in summary["rollback_functions"])
+
+    @pytest.mark.unit
+    def test_failed_rollback_function_reported(self, rollback_manager):
+        """Test a failing rollback function is reported and the rest still run"""
+        calls = []
+        rollback_manager.register_rollback_function(lambda: calls.append("first"), "first")
+        rollback_manager.register_rollback_function(Mock(side_effect=Exception("boom")), "broken")
+
+        results = rollback_manager.rollback_all()
+
+        assert results == {"broken": False, "first": True}
+        assert calls == ["first"]
+
+    @pytest.mark.unit
+    def test_rollback_skipped_in_dry_run(self, rollback_manager):
+        """Test dry-run mode has nothing to roll back"""
+        rollback_manager.register_rollback_function(Mock(), "noop")
+
+        with patch('tests.safety_utils.live_config', Mock(dry_run_only=True)):
+            assert rollback_manager.rollback_all() == {"dry_run": True}
+        rollback_manager.tag_backup.restore_all.assert_not_called()
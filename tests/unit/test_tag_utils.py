@@ -73,6 +73,13 @@ class TestParseTags:
         """Test parsing string with only semicolons"""
         result = parse_tags(";;;")
         assert result == []
+    
+    @pytest.mark.unit
+    def test_parse_tags_returns_independent_lists(self):
+        """Test that mutating a parsed list does not leak into later calls"""
+        first = parse_tags("web;database")
+        first.append("mutated")
+        assert parse_tags("web;database") == ["web", "database"]
 
 
 class TestFormatTags:
@@ -131,6 +138,12 @@ class TestFormatTags:
         """Test formatting mixed data types"""
         result = format_tags(["web", 123, True, "database"])
         assert result == "web;123;True;database"
+    
+    @pytest.mark.unit
+    def test_format_tags_equal_values_of_different_types(self):
+        """Test that equal-hashing values like 1 and True are formatted separately"""
+        assert format_tags([1]) == "1"
+        assert format_tags([True]) == "True"
 
 
 class TestExtractTags:
@@ -203,6 +216,13 @@ class TestExtractTags:
         # Only string tags should be processed
         assert result == ["api", "database"]
     
+    @pytest.mark.unit
+    def test_extract_tags_limit(self, sample_vms):
+        """Test that limit returns only the first tags in sort order"""
+        assert extract_tags(sample_vms, limit=3) == ["api", "backend", "database"]
+        assert extract_tags(sample_vms, limit=0) == []
+        assert extract_tags(sample_vms, limit=100) == extract_tags(sample_vms)
+    
     @pytest.mark.unit
     def test_extract_tags_exception_handling(self, mock_logger):
         """Test exception handling in extract_tags"""
@@ -263,6 +283,33 @@ class TestTagUtilsIntegration:
 
         parsed = parse_tags(" web ; database ;  production  ")
         assert parsed == ["web", "database", "production"]
+    
+    @pytest.mark.unit
+    def test_tag_normalization(self):
+        """Test tag normalization with live-like data"""
+        # Test various tag formats that might come from live systems
+        test_cases = [
+            "production;web;frontend",  # Standard format
+            "production; web ; frontend",  # With spaces
+            "production;;web;frontend",  # Double semicolons
+            ";production;web;frontend;",  # Leading/trailing semicolons
+            "PRODUCTION;Web;FrontEnd",  # Mixed case
+        ]
+        
+        for tags_str in test_cases:
+            parsed = parse_tags(tags_str)
+            formatted = format_tags(parsed)
+            
+            # Should be valid format
+            assert isinstance(formatted, str)
+            
+            # Should not have empty tags
+            reparsed = parse_tags(formatted)
+            assert all(tag.strip() for tag in reparsed)
+            
+            # Should contain expected tag content (case-insensitively)
+            normalized_tags = {tag.lower() for tag in reparsed}
+            assert {"production", "web", "frontend"} <= normalized_tags
 
 
 class TestParseTagStyle: